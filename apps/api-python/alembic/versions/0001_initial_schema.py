@@ -0,0 +1,105 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2025-09-04 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+run_status = sa.Enum('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED', 'CANCELLED', name='runstatus')
+step_status = sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', 'SKIPPED', name='stepstatus')
+step_type = sa.Enum('AI', 'EMAIL', 'LOOP', 'CONNECTOR', name='steptype')
+
+
+def upgrade() -> None:
+    # Databases bootstrapped by the API's create_all() already have these
+    # tables; adopt them instead of failing on the first migration.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('email', sa.String(), nullable=False),
+            sa.Column('name', sa.String(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+        op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+
+    if 'workflows' not in existing:
+        op.create_table(
+            'workflows',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('definition', sa.Text(), nullable=False),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_workflows_id'), 'workflows', ['id'], unique=False)
+
+    if 'runs' not in existing:
+        op.create_table(
+            'runs',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('workflow_id', sa.String(), nullable=False),
+            sa.Column('status', run_status, nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['workflow_id'], ['workflows.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_runs_id'), 'runs', ['id'], unique=False)
+
+    if 'run_steps' not in existing:
+        op.create_table(
+            'run_steps',
+            sa.Column('id', sa.String(), nullable=False),
+            sa.Column('run_id', sa.String(), nullable=False),
+            sa.Column('step_id', sa.String(), nullable=False),
+            sa.Column('step_type', step_type, nullable=False),
+            sa.Column('status', step_status, nullable=True),
+            sa.Column('input_data', sa.Text(), nullable=True),
+            sa.Column('output_data', sa.Text(), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+            sa.ForeignKeyConstraint(['run_id'], ['runs.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index(op.f('ix_run_steps_id'), 'run_steps', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_run_steps_id'), table_name='run_steps')
+    op.drop_table('run_steps')
+    op.drop_index(op.f('ix_runs_id'), table_name='runs')
+    op.drop_table('runs')
+    op.drop_index(op.f('ix_workflows_id'), table_name='workflows')
+    op.drop_table('workflows')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    step_type.drop(op.get_bind(), checkfirst=True)
+    step_status.drop(op.get_bind(), checkfirst=True)
+    run_status.drop(op.get_bind(), checkfirst=True)
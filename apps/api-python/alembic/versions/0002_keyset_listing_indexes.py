@@ -0,0 +1,39 @@
+"""Keyset listing indexes on (created_at, id)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-09-10 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_workflows_created_at_id', 'workflows'),
+    ('ix_runs_created_at_id', 'runs'),
+    ('ix_run_steps_created_at_id', 'run_steps'),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps run_steps writable while the index builds; it cannot
+    # run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.create_index(
+                name, table, ['created_at', 'id'],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,104 @@
+"""Store workflow definitions and step payloads as JSONB
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-09-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 5000
+
+# table -> text columns converted to JSONB
+COLUMNS = {
+    'workflows': ['definition'],
+    'run_steps': ['input_data', 'output_data'],
+}
+
+
+def _backfill(table, columns):
+    """Copy text payloads into the shadow JSONB columns in small batches"""
+    bind = op.get_bind()
+    pending = " OR ".join(f"({c} IS NOT NULL AND {c}_jsonb IS NULL)" for c in columns)
+    assignments = ", ".join(f"{c}_jsonb = {c}::jsonb" for c in columns)
+    statement = sa.text(
+        f"UPDATE {table} SET {assignments} "
+        f"WHERE id IN (SELECT id FROM {table} WHERE {pending} LIMIT {BATCH_SIZE})"
+    )
+    while bind.execute(statement).rowcount:
+        pass
+
+
+def upgrade() -> None:
+    # The conversion runs online: shadow columns are added and kept in sync by
+    # a trigger while existing rows are backfilled in autocommitted batches,
+    # then swapped in with metadata-only renames. A plain ALTER ... TYPE would
+    # rewrite run_steps under an ACCESS EXCLUSIVE lock.
+    with op.get_context().autocommit_block():
+        for table, columns in COLUMNS.items():
+            for column in columns:
+                op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}_jsonb JSONB")
+            sync = "\n".join(f"    NEW.{c}_jsonb := NEW.{c}::jsonb;" for c in columns)
+            op.execute(f"""
+                CREATE OR REPLACE FUNCTION {table}_jsonb_sync() RETURNS trigger AS $$
+                BEGIN
+                {sync}
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql
+            """)
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_jsonb_sync ON {table}")
+            op.execute(f"""
+                CREATE TRIGGER {table}_jsonb_sync BEFORE INSERT OR UPDATE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION {table}_jsonb_sync()
+            """)
+
+        for table, columns in COLUMNS.items():
+            _backfill(table, columns)
+
+        # Prove NOT NULL without holding a lock during the scan, so the
+        # SET NOT NULL in the swap below is a catalog-only change.
+        op.execute(
+            "ALTER TABLE workflows ADD CONSTRAINT workflows_definition_jsonb_not_null "
+            "CHECK (definition_jsonb IS NOT NULL) NOT VALID"
+        )
+        op.execute("ALTER TABLE workflows VALIDATE CONSTRAINT workflows_definition_jsonb_not_null")
+
+    for table, columns in COLUMNS.items():
+        op.execute(f"DROP TRIGGER {table}_jsonb_sync ON {table}")
+        op.execute(f"DROP FUNCTION {table}_jsonb_sync()")
+        for column in columns:
+            op.drop_column(table, column)
+            op.alter_column(table, f"{column}_jsonb", new_column_name=column)
+    op.alter_column('workflows', 'definition', nullable=False)
+    op.drop_constraint('workflows_definition_jsonb_not_null', 'workflows', type_='check')
+
+    # Default jsonb_ops (not jsonb_path_ops) so key-existence (?) is indexed too.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_workflows_definition_gin', 'workflows', ['definition'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_run_steps_output_data_gin', 'run_steps', ['output_data'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_run_steps_output_data_gin', table_name='run_steps')
+    op.drop_index('ix_workflows_definition_gin', table_name='workflows')
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column, type_=sa.Text(), postgresql_using=f"{column}::text"
+            )
@@ -0,0 +1,52 @@
+"""Composite and partial indexes for hot run and step queries
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-09-24 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Per-workflow run listings (keyset on created_at, id)
+        op.create_index(
+            'ix_runs_workflow_id_created_at_id', 'runs', ['workflow_id', 'created_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Retention cleanup; queued and running runs never qualify, so they
+        # are kept out of the index entirely.
+        op.create_index(
+            'ix_runs_status_completed_at', 'runs', ['status', 'completed_at'],
+            postgresql_where=sa.text('completed_at IS NOT NULL'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Loading and paging a run's steps in execution order
+        op.create_index(
+            'ix_run_steps_run_id_created_at_id', 'run_steps', ['run_id', 'created_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_workflows_user_id', 'workflows', ['user_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in [
+            ('ix_workflows_user_id', 'workflows'),
+            ('ix_run_steps_run_id_created_at_id', 'run_steps'),
+            ('ix_runs_status_completed_at', 'runs'),
+            ('ix_runs_workflow_id_created_at_id', 'runs'),
+        ]:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,198 @@
+"""Partition runs and run_steps by month
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-01 10:00:00.000000
+
+Rebuilds both tables as RANGE (created_at) partitioned tables and copies
+the existing rows across. Writes to runs/run_steps wait on the table lock
+for the duration of the copy (reads continue), so run this in a
+maintenance window on large installations.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+PARTITION_MONTHS_AHEAD = 3
+
+PARTITION_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION ensure_month_partitions(parent text, from_month date, to_month date)
+RETURNS void AS $$
+DECLARE
+    month_start date := date_trunc('month', from_month);
+BEGIN
+    WHILE month_start <= to_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            parent || '_' || to_char(month_start, '"y"YYYY"m"MM'),
+            parent,
+            month_start::timestamp AT TIME ZONE 'UTC',
+            (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION drop_month_partitions_before(parent text, cutoff timestamptz)
+RETURNS SETOF text AS $$
+DECLARE
+    partition_name text;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = parent::regclass
+          AND child.relname ~ ('^' || parent || '_y[0-9]{4}m[0-9]{2}$')
+          AND (to_date(right(child.relname, 7), 'YYYY"m"MM') + interval '1 month')::timestamp
+              AT TIME ZONE 'UTC' <= cutoff
+        ORDER BY child.relname
+    LOOP
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, partition_name);
+        EXECUTE format('DROP TABLE %I', partition_name);
+        RETURN NEXT partition_name;
+    END LOOP;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+RUNS_COLUMNS = "id, workflow_id, status, started_at, completed_at, error_message, created_at"
+RUN_STEPS_COLUMNS = (
+    "id, run_id, step_id, step_type, status, input_data, output_data, "
+    "error_message, started_at, completed_at, created_at"
+)
+
+RUNS_INDEXES = """
+CREATE INDEX ix_runs_id ON runs (id);
+CREATE INDEX ix_runs_created_at_id ON runs (created_at, id);
+CREATE INDEX ix_runs_workflow_id_created_at_id ON runs (workflow_id, created_at, id);
+CREATE INDEX ix_runs_status_completed_at ON runs (status, completed_at) WHERE completed_at IS NOT NULL;
+"""
+
+RUN_STEPS_INDEXES = """
+CREATE INDEX ix_run_steps_id ON run_steps (id);
+CREATE INDEX ix_run_steps_created_at_id ON run_steps (created_at, id);
+CREATE INDEX ix_run_steps_run_id_created_at_id ON run_steps (run_id, created_at, id);
+CREATE INDEX ix_run_steps_output_data_gin ON run_steps USING gin (output_data);
+"""
+
+
+def _execute(sql):
+    # exec_driver_sql: the plpgsql bodies contain % and : characters
+    op.get_bind().exec_driver_sql(sql)
+
+
+def _retire(table):
+    _execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+    _execute(f"ALTER INDEX {table}_pkey RENAME TO {table}_legacy_pkey")
+
+
+def upgrade() -> None:
+    _execute("LOCK TABLE runs, run_steps IN EXCLUSIVE MODE")
+    _retire('run_steps')
+    _retire('runs')
+
+    _execute("""
+        CREATE TABLE runs (
+            id VARCHAR NOT NULL,
+            workflow_id VARCHAR NOT NULL REFERENCES workflows (id),
+            status runstatus,
+            started_at TIMESTAMP WITH TIME ZONE,
+            completed_at TIMESTAMP WITH TIME ZONE,
+            error_message TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    # run_steps.run_id loses its foreign key: the partitioned runs table has
+    # no unique constraint on id alone for it to reference.
+    _execute("""
+        CREATE TABLE run_steps (
+            id VARCHAR NOT NULL,
+            run_id VARCHAR NOT NULL,
+            step_id VARCHAR NOT NULL,
+            step_type steptype NOT NULL,
+            status stepstatus,
+            input_data JSONB,
+            output_data JSONB,
+            error_message TEXT,
+            started_at TIMESTAMP WITH TIME ZONE,
+            completed_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    _execute(PARTITION_FUNCTIONS_SQL)
+    for table, columns in [('runs', RUNS_COLUMNS), ('run_steps', RUN_STEPS_COLUMNS)]:
+        _execute(f"""
+            SELECT ensure_month_partitions(
+                '{table}',
+                COALESCE((SELECT min(created_at) FROM {table}_legacy), now())::date,
+                (now() + interval '{PARTITION_MONTHS_AHEAD} months')::date
+            )
+        """)
+        _execute(f"""
+            INSERT INTO {table} ({columns})
+            SELECT {columns.replace('created_at', 'COALESCE(created_at, now())')}
+            FROM {table}_legacy
+        """)
+
+    _execute("DROP TABLE run_steps_legacy")
+    _execute("DROP TABLE runs_legacy")
+    _execute(RUNS_INDEXES)
+    _execute(RUN_STEPS_INDEXES)
+
+
+def downgrade() -> None:
+    _execute("LOCK TABLE runs, run_steps IN EXCLUSIVE MODE")
+    _retire('run_steps')
+    _retire('runs')
+
+    _execute("""
+        CREATE TABLE runs (
+            id VARCHAR NOT NULL PRIMARY KEY,
+            workflow_id VARCHAR NOT NULL REFERENCES workflows (id),
+            status runstatus,
+            started_at TIMESTAMP WITH TIME ZONE,
+            completed_at TIMESTAMP WITH TIME ZONE,
+            error_message TEXT,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    _execute("""
+        CREATE TABLE run_steps (
+            id VARCHAR NOT NULL PRIMARY KEY,
+            run_id VARCHAR NOT NULL REFERENCES runs (id),
+            step_id VARCHAR NOT NULL,
+            step_type steptype NOT NULL,
+            status stepstatus,
+            input_data JSONB,
+            output_data JSONB,
+            error_message TEXT,
+            started_at TIMESTAMP WITH TIME ZONE,
+            completed_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    _execute(f"INSERT INTO runs ({RUNS_COLUMNS}) SELECT {RUNS_COLUMNS} FROM runs_legacy")
+    # Steps whose run was already dropped by retention cannot satisfy the FK
+    _execute(f"""
+        INSERT INTO run_steps ({RUN_STEPS_COLUMNS})
+        SELECT {RUN_STEPS_COLUMNS} FROM run_steps_legacy
+        WHERE run_id IN (SELECT id FROM runs)
+    """)
+
+    _execute("DROP TABLE run_steps_legacy")
+    _execute("DROP TABLE runs_legacy")
+    _execute("DROP FUNCTION drop_month_partitions_before(text, timestamptz)")
+    _execute("DROP FUNCTION ensure_month_partitions(text, date, date)")
+    _execute(RUNS_INDEXES)
+    _execute(RUN_STEPS_INDEXES)
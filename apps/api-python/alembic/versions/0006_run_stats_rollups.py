@@ -0,0 +1,95 @@
+"""Run statistics rollup tables
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-10-08 10:00:00.000000
+
+Creates the per-workflow rollups the worker maintains as runs finish and
+backfills them, in hourly buckets, from the runs and steps already present.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# Snapshot of DURATION_BOUNDS_MS in apps/worker-python/app/stats.py
+DURATION_BOUNDS_MS = [
+    10, 20, 50, 100, 200, 500,
+    1_000, 2_000, 5_000, 10_000, 20_000, 50_000,
+    100_000, 200_000, 500_000, 1_000_000, 2_000_000, 3_600_000,
+    2**31 - 1,
+]
+
+# One row per finished run or step: (workflow_id, bucket_start, subject,
+# status, duration_ms); duration is NULL when either timestamp is missing.
+SAMPLES = """
+    SELECT workflow_id, date_trunc('hour', completed_at) AS bucket_start, 'run' AS subject,
+           status::text AS status,
+           (extract(epoch FROM completed_at - started_at) * 1000)::bigint AS duration_ms
+    FROM runs
+    WHERE status IN ('COMPLETED', 'FAILED') AND completed_at IS NOT NULL
+    UNION ALL
+    SELECT runs.workflow_id, date_trunc('hour', runs.completed_at), run_steps.step_type::text,
+           run_steps.status::text,
+           (extract(epoch FROM run_steps.completed_at
+                         - COALESCE(run_steps.started_at, run_steps.created_at)) * 1000)::bigint
+    FROM run_steps JOIN runs ON runs.id = run_steps.run_id
+    WHERE runs.status IN ('COMPLETED', 'FAILED') AND runs.completed_at IS NOT NULL
+      AND run_steps.status IN ('COMPLETED', 'FAILED')
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'run_stats_rollups',
+        sa.Column('workflow_id', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.Column('duration_ms_sum', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('workflow_id', 'bucket_start', 'subject', 'status'),
+    )
+    op.create_table(
+        'run_duration_histograms',
+        sa.Column('workflow_id', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('le_ms', sa.BigInteger(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('workflow_id', 'bucket_start', 'subject', 'le_ms'),
+    )
+
+    bounds = "ARRAY[" + ", ".join(str(bound) for bound in DURATION_BOUNDS_MS) + "]::bigint[]"
+    op.execute(f"""
+        INSERT INTO run_stats_rollups (workflow_id, bucket_start, subject, status, count, duration_ms_sum)
+        SELECT workflow_id, bucket_start, subject, status, count(*), coalesce(sum(greatest(duration_ms, 0)), 0)
+        FROM ({SAMPLES}) samples
+        GROUP BY workflow_id, bucket_start, subject, status
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute(f"""
+        INSERT INTO run_duration_histograms (workflow_id, bucket_start, subject, le_ms, count)
+        SELECT workflow_id, bucket_start, subject, le_ms, count(*)
+        FROM (
+            SELECT workflow_id, bucket_start, subject,
+                   coalesce(
+                       (SELECT min(bound) FROM unnest({bounds}) bound WHERE bound >= greatest(duration_ms, 0)),
+                       {DURATION_BOUNDS_MS[-1]}
+                   ) AS le_ms
+            FROM ({SAMPLES}) samples
+            WHERE duration_ms IS NOT NULL
+        ) bucketed
+        GROUP BY workflow_id, bucket_start, subject, le_ms
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('run_duration_histograms')
+    op.drop_table('run_stats_rollups')
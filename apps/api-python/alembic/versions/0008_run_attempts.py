@@ -0,0 +1,25 @@
+"""Count the attempts at each run
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A constant default is a catalog-only change, even on the partitioned table
+    op.add_column('runs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('runs', 'attempts')
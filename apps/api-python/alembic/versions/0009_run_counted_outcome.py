@@ -0,0 +1,40 @@
+"""Keep the outcome the stats rollups hold for each run
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-10-16 10:00:00.000000
+
+The worker took the counted outcome of a resumed run from the run's own
+timestamps, which the next attempt overwrites. The outcome now has its
+own columns, backfilled for the runs counted so far.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('runs', sa.Column('counted_status', sa.String(), nullable=True))
+    op.add_column('runs', sa.Column('counted_started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('runs', sa.Column('counted_completed_at', sa.DateTime(timezone=True), nullable=True))
+    # A queued run that still has a completion time failed before and was
+    # resumed or is waiting for a retry
+    op.execute("""
+        UPDATE runs
+        SET counted_status = CASE WHEN status = 'COMPLETED' THEN 'COMPLETED' ELSE 'FAILED' END,
+            counted_started_at = started_at,
+            counted_completed_at = completed_at
+        WHERE status IN ('COMPLETED', 'FAILED', 'QUEUED') AND completed_at IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('runs', 'counted_completed_at')
+    op.drop_column('runs', 'counted_started_at')
+    op.drop_column('runs', 'counted_status')
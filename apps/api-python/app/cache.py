@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_CACHE_SIZE = int(os.getenv("WORKFLOW_CACHE_SIZE", "1024"))
+WORKFLOW_CACHE_TTL = float(os.getenv("WORKFLOW_CACHE_TTL", "300"))
+# The local tier can only be invalidated in the process that handled the
+# write, so with several API processes other copies go stale until they
+# expire; keep it short whether or not Redis is in front of the database.
+WORKFLOW_CACHE_LOCAL_TTL = float(os.getenv("WORKFLOW_CACHE_LOCAL_TTL", "5"))
+WORKFLOW_CACHE_REDIS = os.getenv("WORKFLOW_CACHE_REDIS", "false").lower() == "true"
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+
+class WorkflowCache:
+    """Two-tier cache of serialized workflows keyed by id.
+
+    Entries are ``{"etag": ..., "body": ...}``. Redis failures degrade to a
+    cache miss rather than failing the request.
+    """
+
+    key_prefix = "workflow:"
+
+    def __init__(self, local: LRUCache, use_redis: bool, ttl: float):
+        self.local = local
+        self.use_redis = use_redis
+        self.ttl = ttl
+
+    async def get(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        entry = self.local.get(workflow_id)
+        if entry is not None or not self.use_redis:
+            return entry
+        try:
+            raw = await get_redis().get(self.key_prefix + workflow_id)
+        except Exception as exc:
+            logger.warning("workflow cache read failed: %s", exc)
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        self.local.set(workflow_id, entry)
+        return entry
+
+    async def set(self, workflow_id: str, entry: Dict[str, Any]):
+        self.local.set(workflow_id, entry)
+        if not self.use_redis:
+            return
+        try:
+            await get_redis().set(self.key_prefix + workflow_id, json.dumps(entry), ex=int(self.ttl))
+        except Exception as exc:
+            logger.warning("workflow cache write failed: %s", exc)
+
+    async def invalidate(self, workflow_id: str):
+        self.local.delete(workflow_id)
+        if not self.use_redis:
+            return
+        try:
+            await get_redis().delete(self.key_prefix + workflow_id)
+        except Exception as exc:
+            logger.warning("workflow cache invalidation failed: %s", exc)
+
+
+workflow_cache = WorkflowCache(
+    LRUCache(WORKFLOW_CACHE_SIZE, WORKFLOW_CACHE_LOCAL_TTL),
+    use_redis=WORKFLOW_CACHE_REDIS,
+    ttl=WORKFLOW_CACHE_TTL,
+)
+
+
+def workflow_etag(workflow) -> str:
+    """Weak validator derived from the row's last modification time"""
+    modified = workflow.updated_at or workflow.created_at
+    return f'W/"{workflow.id}-{modified.timestamp():.6f}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/ prefixes are ignored on both sides
+    bare = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == bare for tag in candidates)
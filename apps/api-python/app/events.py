@@ -0,0 +1,97 @@
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Set
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# The worker publishes run and step status transitions on one channel per
+# run (see apps/worker-python/app/events.py); keep the naming in sync.
+RUN_CHANNEL_PREFIX = "run-events:"
+TERMINAL_RUN_STATUSES = {"COMPLETED", "FAILED", "CANCELLED"}
+
+RUN_EVENTS_KEEPALIVE = float(os.getenv("RUN_EVENTS_KEEPALIVE", "15"))
+WATCHER_QUEUE_SIZE = 1000
+
+
+def run_channel(run_id: str) -> str:
+    return f"{RUN_CHANNEL_PREFIX}{run_id}"
+
+
+async def publish_run_event(run_id: str, event: dict):
+    """Publish an event to the run's watchers; delivery is best-effort"""
+    try:
+        await get_redis().publish(run_channel(run_id), json.dumps({"run_id": run_id, **event}))
+    except Exception as exc:
+        logger.warning("run event publish failed: %s", exc)
+
+
+class RunEventHub:
+    """Fan Redis run-event channels out to in-process watchers.
+
+    One pub/sub connection per API process carries every watched channel;
+    a channel is subscribed while at least one watcher is attached to it.
+    """
+
+    def __init__(self):
+        self._pubsub = None
+        self._reader = None
+        self._watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def watch(self, run_id: str):
+        channel = run_channel(run_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=WATCHER_QUEUE_SIZE)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            watchers = self._watchers.setdefault(channel, set())
+            if not watchers:
+                await self._pubsub.subscribe(channel)
+            watchers.add(queue)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+        try:
+            yield queue
+        finally:
+            async with self._lock:
+                watchers = self._watchers.get(channel, set())
+                watchers.discard(queue)
+                if not watchers:
+                    self._watchers.pop(channel, None)
+                    await self._pubsub.unsubscribe(channel)
+
+    async def _read(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except Exception as exc:
+                logger.warning("run event subscription failed: %s", exc)
+                await asyncio.sleep(1.0)
+                continue
+            if message is None:
+                if not self._watchers:
+                    await asyncio.sleep(0.1)
+                continue
+            try:
+                event = json.loads(message["data"])
+            except ValueError as exc:
+                # One bad payload must not end the reader every watcher shares
+                logger.warning("malformed run event on %s: %s", message["channel"], exc)
+                continue
+            for queue in list(self._watchers.get(message["channel"], ())):
+                if queue.full():
+                    # A stalled watcher loses its oldest events rather than
+                    # the newest, so the terminal status always gets through.
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+
+run_events = RunEventHub()
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from .database import session_scope
+from .redis_client import get_redis
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# How long a completed response is replayed for
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+# Upper bound on one request's runtime; a claim older than this is abandoned
+IDEMPOTENCY_LOCK_TTL = int(os.getenv("IDEMPOTENCY_LOCK_TTL", "60"))
+# How long a duplicate waits for the in-flight original before giving up
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+REUSED_KEY_DETAIL = "Idempotency-Key was already used with a different request"
+
+PENDING, DONE, CLAIMED = "pending", "done", "claimed"
+
+
+def _redis_key(record_key: str) -> str:
+    return f"idempotency:{record_key}"
+
+
+async def _stored(record_key: str) -> Optional[dict]:
+    """Completed response kept in Postgres, if still live"""
+    async with session_scope() as db:
+        row = await db.scalar(
+            select(models.IdempotencyKey).where(
+                models.IdempotencyKey.key == record_key,
+                models.IdempotencyKey.response.is_not(None),
+                models.IdempotencyKey.expires_at > datetime.now(timezone.utc),
+            )
+        )
+    if row is None:
+        return None
+    return {"state": DONE, "fingerprint": row.fingerprint, "body": row.response}
+
+
+async def _claim_in_postgres(record_key: str, fingerprint: str) -> Tuple[str, Optional[dict]]:
+    """Claim through the table when Redis is unreachable.
+
+    A row is taken over when its claim was abandoned or it has expired.
+    """
+    now = datetime.now(timezone.utc)
+    table = models.IdempotencyKey.__table__
+    statement = insert(table).values(
+        key=record_key,
+        fingerprint=fingerprint,
+        locked_until=now + timedelta(seconds=IDEMPOTENCY_LOCK_TTL),
+        expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.key],
+        set_={
+            "fingerprint": statement.excluded.fingerprint,
+            "response": None,
+            "locked_until": statement.excluded.locked_until,
+            "expires_at": statement.excluded.expires_at,
+        },
+        where=((table.c.response.is_(None) & (table.c.locked_until < now)) | (table.c.expires_at < now)),
+    ).returning(table.c.key)
+    async with session_scope() as db:
+        claimed = (await db.execute(statement)).first()
+        await db.commit()
+        if claimed:
+            return CLAIMED, None
+        row = await db.get(models.IdempotencyKey, record_key)
+    if row is None or row.response is None:
+        return PENDING, None
+    return DONE, {"state": DONE, "fingerprint": row.fingerprint, "body": row.response}
+
+
+async def _try_claim(record_key: str, fingerprint: str) -> Tuple[str, Optional[dict]]:
+    pending = json.dumps({"state": PENDING, "fingerprint": fingerprint})
+    try:
+        redis = get_redis()
+        if await redis.set(_redis_key(record_key), pending, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+            claimed = True
+        else:
+            claimed = False
+            raw = await redis.get(_redis_key(record_key))
+    except Exception as exc:
+        logger.warning("idempotency cache unavailable, using Postgres: %s", exc)
+        return await _claim_in_postgres(record_key, fingerprint)
+
+    if claimed:
+        # The cache may have evicted or lost a response Postgres still holds;
+        # put it back over our pending claim so duplicates replay it too
+        stored = await _stored(record_key)
+        if stored is not None:
+            await _cache(record_key, stored)
+            return DONE, stored
+        return CLAIMED, None
+    if raw is None:  # expired between SET and GET; try again
+        return PENDING, None
+    record = json.loads(raw)
+    return record["state"], record
+
+
+async def _cache(record_key: str, record: dict):
+    try:
+        await get_redis().set(_redis_key(record_key), json.dumps(record), ex=IDEMPOTENCY_TTL)
+    except Exception as exc:
+        logger.warning("idempotency cache write failed: %s", exc)
+
+
+async def _complete(record_key: str, fingerprint: str, body: Any):
+    await _cache(record_key, {"state": DONE, "fingerprint": fingerprint, "body": body})
+    table = models.IdempotencyKey.__table__
+    statement = insert(table).values(
+        key=record_key,
+        fingerprint=fingerprint,
+        response=body,
+        locked_until=datetime.now(timezone.utc),
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=IDEMPOTENCY_TTL),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.key],
+        set_={
+            "fingerprint": statement.excluded.fingerprint,
+            "response": statement.excluded.response,
+            "locked_until": statement.excluded.locked_until,
+            "expires_at": statement.excluded.expires_at,
+        },
+    )
+    try:
+        async with session_scope() as db:
+            await db.execute(statement)
+            await db.commit()
+    except Exception as exc:
+        logger.warning("idempotency record write failed: %s", exc)
+
+
+async def _release(record_key: str):
+    """Drop an unfinished claim so a retry can run the request again"""
+    try:
+        await get_redis().delete(_redis_key(record_key))
+    except Exception as exc:
+        logger.warning("idempotency cache release failed: %s", exc)
+    try:
+        async with session_scope() as db:
+            await db.execute(
+                delete(models.IdempotencyKey).where(
+                    models.IdempotencyKey.key == record_key,
+                    models.IdempotencyKey.response.is_(None),
+                )
+            )
+            await db.commit()
+    except Exception as exc:
+        logger.warning("idempotency record release failed: %s", exc)
+
+
+def _replay(record: dict, fingerprint: str) -> JSONResponse:
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail=REUSED_KEY_DETAIL)
+    return JSONResponse(record["body"], headers={REPLAYED_HEADER: "true"})
+
+
+async def idempotent(
+    scope: str,
+    key: Optional[str],
+    request_body: str,
+    work: Callable[[], Awaitable[Any]],
+    response_model=None,
+):
+    """Run ``work`` at most once per ``key`` and replay its response to retries.
+
+    Without a key ``work`` simply runs. A duplicate that arrives while the
+    original is in flight waits for it for up to IDEMPOTENCY_WAIT_SECONDS.
+    Only successful responses are stored; if ``work`` raises, the claim is
+    released and the next retry runs the request again.
+    """
+    if not key:
+        return await work()
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+    record_key = f"{scope}:{key}"
+    fingerprint = hashlib.sha256(request_body.encode()).hexdigest()
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        state, record = await _try_claim(record_key, fingerprint)
+        if state == CLAIMED:
+            break
+        if state == DONE:
+            return _replay(record, fingerprint)
+        if record is not None and record["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail=REUSED_KEY_DETAIL)
+        if time.monotonic() > deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+
+    try:
+        result = await work()
+    except BaseException:
+        await _release(record_key)
+        raise
+    body = jsonable_encoder(response_model.model_validate(result) if response_model else result)
+    await _complete(record_key, fingerprint, body)
+    return JSONResponse(body)
@@ -1,21 +1,58 @@
-from fastapi import FastAPI, Depends, HTTPException, status
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
-import json
-import uuid
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.concurrency import run_in_threadpool
 
-from .database import get_db, engine
-from . import models, schemas
-from .routes import workflows, runs, steps, connectors, email
+from fastapi.middleware.cors import CORSMiddleware
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+from .compression import CompressionMiddleware
+from .database import engine, warm_pool, dispose_engines
+from .metrics import MetricsMiddleware
+from .replicas import PrimaryPinMiddleware, replica_set
+from . import models
+from .routes import workflows, runs, steps, connectors, email, exports
+
+logger = logging.getLogger(__name__)
+
+# Schema management belongs to Alembic; create_all only bootstraps local
+# databases. Deployments set DB_CREATE_ALL=false so startup runs no DDL.
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "true").lower() == "true"
+STARTUP_RETRY_SECONDS = 2.0
+
+async def prepare_database(app: FastAPI):
+    """Bootstrap the schema if enabled, warm the pool, then mark the app ready"""
+    while True:
+        try:
+            if DB_CREATE_ALL:
+                await run_in_threadpool(models.Base.metadata.create_all, bind=engine)
+            await warm_pool()
+            app.state.ready = True
+            return
+        except Exception as exc:
+            logger.warning("database not ready, retrying: %s", exc)
+            await asyncio.sleep(STARTUP_RETRY_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up runs in the background: the process serves /health at once and
+    # reports /ready only when the database is reachable.
+    app.state.ready = False
+    preparing = asyncio.create_task(prepare_database(app))
+    yield
+    preparing.cancel()
+    await replica_set.dispose()
+    await dispose_engines()
 
 app = FastAPI(
     title="Algorythmos AI Agents API",
     description="Python FastAPI backend for Algorythmos AI Agents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -27,12 +64,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Read-your-writes: clients that just wrote read from the primary for a while
+app.add_middleware(PrimaryPinMiddleware)
+
+# gzip/brotli for large JSON bodies, negotiated on Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+# Outermost, so latency covers compression and every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(workflows.router, prefix="/api/workflows", tags=["workflows"])
 app.include_router(runs.router, prefix="/api/runs", tags=["runs"])
 app.include_router(steps.router, prefix="/api/steps", tags=["steps"])
 app.include_router(connectors.router, prefix="/api/connectors", tags=["connectors"])
 app.include_router(email.router, prefix="/api/email", tags=["email"])
+app.include_router(exports.router, prefix="/api/export", tags=["export"])
 
 @app.get("/")
 async def root():
@@ -42,135 +88,15 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "algorythmos-ai-agents-api"}
 
-@app.get("/api/workflows", response_model=List[schemas.Workflow])
-async def get_workflows(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
-    """Get all workflows"""
-    workflows = db.query(models.Workflow).offset(skip).limit(limit).all()
-    return workflows
-
-@app.post("/api/workflows", response_model=schemas.Workflow)
-async def create_workflow(
-    workflow: schemas.WorkflowCreate,
-    db: Session = Depends(get_db)
-):
-    """Create a new workflow"""
-    db_workflow = models.Workflow(
-        id=str(uuid.uuid4()),
-        name=workflow.name,
-        description=workflow.description,
-        definition=json.dumps(workflow.definition),
-        is_active=workflow.is_active,
-        user_id=workflow.user_id
-    )
-    db.add(db_workflow)
-    db.commit()
-    db.refresh(db_workflow)
-    
-    # Parse definition back to dict for response
-    db_workflow.definition = json.loads(db_workflow.definition)
-    return db_workflow
-
-@app.get("/api/workflows/{workflow_id}", response_model=schemas.Workflow)
-async def get_workflow(
-    workflow_id: str,
-    db: Session = Depends(get_db)
-):
-    """Get a specific workflow"""
-    workflow = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    # Parse definition to dict
-    workflow.definition = json.loads(workflow.definition)
-    return workflow
-
-@app.put("/api/workflows/{workflow_id}", response_model=schemas.Workflow)
-async def update_workflow(
-    workflow_id: str,
-    workflow_update: schemas.WorkflowUpdate,
-    db: Session = Depends(get_db)
-):
-    """Update a workflow"""
-    workflow = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    update_data = workflow_update.dict(exclude_unset=True)
-    if "definition" in update_data:
-        update_data["definition"] = json.dumps(update_data["definition"])
-    
-    for field, value in update_data.items():
-        setattr(workflow, field, value)
-    
-    db.commit()
-    db.refresh(workflow)
-    
-    # Parse definition to dict
-    workflow.definition = json.loads(workflow.definition)
-    return workflow
-
-@app.delete("/api/workflows/{workflow_id}")
-async def delete_workflow(
-    workflow_id: str,
-    db: Session = Depends(get_db)
-):
-    """Delete a workflow"""
-    workflow = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    db.delete(workflow)
-    db.commit()
-    return {"message": "Workflow deleted successfully"}
-
-@app.get("/api/runs", response_model=List[schemas.Run])
-async def get_runs(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
-    """Get all runs"""
-    runs = db.query(models.Run).offset(skip).limit(limit).all()
-    return runs
-
-@app.post("/api/runs", response_model=schemas.Run)
-async def create_run(
-    run: schemas.RunCreate,
-    db: Session = Depends(get_db)
-):
-    """Create a new run"""
-    db_run = models.Run(
-        id=str(uuid.uuid4()),
-        workflow_id=run.workflow_id,
-        status=models.RunStatus.QUEUED
-    )
-    db.add(db_run)
-    db.commit()
-    db.refresh(db_run)
-    return db_run
-
-@app.get("/api/runs/{run_id}", response_model=schemas.RunWithSteps)
-async def get_run(
-    run_id: str,
-    db: Session = Depends(get_db)
-):
-    """Get a specific run with its steps"""
-    run = db.query(models.Run).filter(models.Run.id == run_id).first()
-    if not run:
-        raise HTTPException(status_code=404, detail="Run not found")
-    
-    # Parse step data
-    for step in run.steps:
-        if step.input_data:
-            step.input_data = json.loads(step.input_data)
-        if step.output_data:
-            step.output_data = json.loads(step.output_data)
-    
-    return run
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/ready")
+async def readiness_check():
+    if not app.state.ready:
+        return JSONResponse({"status": "starting"}, status_code=503)
+    return {"status": "ready"}
 
 if __name__ == "__main__":
     import uvicorn
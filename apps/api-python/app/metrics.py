@@ -0,0 +1,89 @@
+import time
+
+from prometheus_client import REGISTRY, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .database import async_engine, engine
+from .replicas import replica_set
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+IN_FLIGHT = Gauge("api_requests_in_flight", "HTTP requests currently being served")
+
+# Paths that match no route share one label so scanners can't blow up the
+# series count.
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(app, scope: Scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Record latency and in-flight count for every HTTP request.
+
+    Latency runs until the response has been fully sent, so streamed
+    responses (exports, SSE) are measured end to end.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            REQUEST_LATENCY.labels(
+                scope["method"], route_template(scope["app"], scope), str(status)
+            ).observe(time.perf_counter() - started)
+
+
+class PoolCollector:
+    """Report SQLAlchemy pool usage at scrape time"""
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        idle = GaugeMetricFamily("db_pool_idle", "Idle pooled connections", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections above pool size", labels=["engine"])
+        engines = {"sync": engine}
+        if async_engine is not None:
+            engines["async"] = async_engine.sync_engine
+        for number, replica in enumerate(replica_set.replicas):
+            pooled = replica.engine
+            engines[f"replica-{number}"] = getattr(pooled, "sync_engine", pooled)
+        for name, pooled in engines.items():
+            pool = pooled.pool
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            idle.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield from (size, checked_out, idle, overflow)
+
+
+REGISTRY.register(PoolCollector())
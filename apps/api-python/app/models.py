@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, ForeignKey, Index, PrimaryKeyConstraint, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from enum import Enum
 from .database import Base
+from . import partitions
 
 class RunStatus(str, Enum):
     QUEUED = "QUEUED"
@@ -41,7 +43,7 @@ class Workflow(Base):
     id = Column(String, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    definition = Column(Text, nullable=False)  # JSON string
+    definition = Column(JSONB(none_as_null=True), nullable=False)
     is_active = Column(Boolean, default=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -50,33 +52,126 @@ class Workflow(Base):
     user = relationship("User", back_populates="workflows")
     runs = relationship("Run", back_populates="workflow")
 
+    __table_args__ = (
+        Index("ix_workflows_created_at_id", "created_at", "id"),
+        Index("ix_workflows_definition_gin", "definition", postgresql_using="gin"),
+        Index("ix_workflows_user_id", "user_id"),
+    )
+
 class Run(Base):
     __tablename__ = "runs"
     
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, nullable=False, index=True)
     workflow_id = Column(String, ForeignKey("workflows.id"), nullable=False)
     status = Column(SQLEnum(RunStatus), default=RunStatus.QUEUED)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Times a worker has started the run since it was created or resumed
+    attempts = Column(Integer, server_default="0", nullable=False)
+    # The outcome the stats rollups hold for the run; the worker replaces it
+    # when a resumed or retried run finishes again
+    counted_status = Column(String, nullable=True)
+    counted_started_at = Column(DateTime(timezone=True), nullable=True)
+    counted_completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     workflow = relationship("Workflow", back_populates="runs")
-    steps = relationship("RunStep", back_populates="run")
+    steps = relationship(
+        "RunStep",
+        back_populates="run",
+        primaryjoin="Run.id == foreign(RunStep.run_id)",
+        order_by="[RunStep.created_at, RunStep.id]",
+    )
+
+    # Range-partitioned by month (see partitions.py). Postgres requires the
+    # partition key in the primary key; rows are still identified by id alone.
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        Index("ix_runs_created_at_id", "created_at", "id"),
+        Index("ix_runs_workflow_id_created_at_id", "workflow_id", "created_at", "id"),
+        Index(
+            "ix_runs_status_completed_at", "status", "completed_at",
+            postgresql_where=text("completed_at IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
 
 class RunStep(Base):
     __tablename__ = "run_steps"
     
-    id = Column(String, primary_key=True, index=True)
-    run_id = Column(String, ForeignKey("runs.id"), nullable=False)
+    id = Column(String, nullable=False, index=True)
+    # No foreign key: a partitioned runs table has no unique key on id alone.
+    # Steps are dropped with their month's partition instead of cascading.
+    run_id = Column(String, nullable=False)
     step_id = Column(String, nullable=False)
     step_type = Column(SQLEnum(StepType), nullable=False)
     status = Column(SQLEnum(StepStatus), default=StepStatus.PENDING)
-    input_data = Column(Text, nullable=True)  # JSON string
-    output_data = Column(Text, nullable=True)  # JSON string
+    input_data = Column(JSONB(none_as_null=True), nullable=True)
+    output_data = Column(JSONB(none_as_null=True), nullable=True)
     error_message = Column(Text, nullable=True)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
-    run = relationship("Run", back_populates="steps")
+    run = relationship("Run", back_populates="steps", primaryjoin="Run.id == foreign(RunStep.run_id)")
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        Index("ix_run_steps_created_at_id", "created_at", "id"),
+        Index("ix_run_steps_run_id_created_at_id", "run_id", "created_at", "id"),
+        Index("ix_run_steps_output_data_gin", "output_data", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+partitions.register(Run.__table__, RunStep.__table__)
+
+# Rollups are maintained by the worker as runs finish (see
+# apps/worker-python/app/stats.py). ``subject`` is "run" for whole runs or a
+# step type for steps; time buckets are keyed on the completion time.
+class RunStatsRollup(Base):
+    __tablename__ = "run_stats_rollups"
+
+    workflow_id = Column(String, nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    subject = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    count = Column(BigInteger, nullable=False, default=0)
+    # Sum over the samples that had both start and completion times; their
+    # number is the total of the matching histogram rows.
+    duration_ms_sum = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("workflow_id", "bucket_start", "subject", "status"),
+    )
+
+class RunDurationHistogram(Base):
+    __tablename__ = "run_duration_histograms"
+
+    workflow_id = Column(String, nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    subject = Column(String, nullable=False)
+    le_ms = Column(BigInteger, nullable=False)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("workflow_id", "bucket_start", "subject", "le_ms"),
+    )
+
+# Stored responses for Idempotency-Key requests (see idempotency.py). Redis
+# is the primary store; rows back it up and serve claims when it is down.
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    response = Column(JSONB(none_as_null=True), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
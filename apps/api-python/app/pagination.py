@@ -0,0 +1,53 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+
+# Listings are ordered newest first on (created_at, id); each model carries a
+# matching composite index so every page is a bounded index range scan.
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Encode a row position as an opaque, URL-safe cursor"""
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(query: Select, model: Any, cursor: Optional[str], limit: int, descending: bool = True) -> Select:
+    """Apply keyset ordering and the cursor predicate to a listing query.
+
+    One extra row is fetched so page_of can tell whether a next page exists.
+    """
+    position = tuple_(model.created_at, model.id)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        bound = tuple_(created_at, row_id)
+        query = query.where(position < bound if descending else position > bound)
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+    return query.limit(limit + 1)
+
+
+def page_of(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Split a keyset result into the page items and the next cursor"""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return items, next_cursor
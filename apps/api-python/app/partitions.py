@@ -0,0 +1,74 @@
+"""Monthly range partitioning of runs and run_steps.
+
+Partitions are named ``<table>_yYYYYmMM`` and created ahead of time by
+``ensure_month_partitions``; retention detaches and drops whole partitions
+with ``drop_month_partitions_before``. Both functions live in the database
+(migration 0005) so the worker's maintenance tasks only call them.
+"""
+
+from sqlalchemy import event
+
+PARTITIONED_TABLES = ("runs", "run_steps")
+PARTITION_MONTHS_AHEAD = 3
+
+PARTITION_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION ensure_month_partitions(parent text, from_month date, to_month date)
+RETURNS void AS $$
+DECLARE
+    month_start date := date_trunc('month', from_month);
+BEGIN
+    WHILE month_start <= to_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            parent || '_' || to_char(month_start, '"y"YYYY"m"MM'),
+            parent,
+            month_start::timestamp AT TIME ZONE 'UTC',
+            (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION drop_month_partitions_before(parent text, cutoff timestamptz)
+RETURNS SETOF text AS $$
+DECLARE
+    partition_name text;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = parent::regclass
+          AND child.relname ~ ('^' || parent || '_y[0-9]{4}m[0-9]{2}$')
+          AND (to_date(right(child.relname, 7), 'YYYY"m"MM') + interval '1 month')::timestamp
+              AT TIME ZONE 'UTC' <= cutoff
+        ORDER BY child.relname
+    LOOP
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent, partition_name);
+        EXECUTE format('DROP TABLE %I', partition_name);
+        RETURN NEXT partition_name;
+    END LOOP;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def ensure_partitions_sql(table: str) -> str:
+    """Partitions from last month through PARTITION_MONTHS_AHEAD months ahead"""
+    return (
+        f"SELECT ensure_month_partitions('{table}', "
+        f"(now() - interval '1 month')::date, "
+        f"(now() + interval '{PARTITION_MONTHS_AHEAD} months')::date)"
+    )
+
+
+def _create_partitions(target, connection, **kw):
+    connection.exec_driver_sql(PARTITION_FUNCTIONS_SQL)
+    connection.exec_driver_sql(ensure_partitions_sql(target.name))
+
+
+def register(*tables):
+    """Create the helper functions and initial partitions after create_all"""
+    for table in tables:
+        event.listen(table, "after_create", _create_partitions)
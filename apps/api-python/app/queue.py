@@ -0,0 +1,44 @@
+import os
+import time
+from typing import Iterable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Task names registered by apps/worker-python
+EXECUTE_WORKFLOW_TASK = "app.tasks.workflow_tasks.execute_workflow"
+# Read by the worker to measure queue wait (apps/worker-python/app/metrics.py)
+PUBLISHED_AT_HEADER = "published_at"
+# A run RUNNING for longer than this has lost its worker and may be resumed;
+# the worker's setting of the same name (app/tasks/workflow_tasks.py)
+WORKFLOW_RUN_LEASE = int(os.getenv("WORKFLOW_RUN_LEASE", "1800"))
+
+_celery = None
+
+
+def get_celery():
+    """Return the publish-only Celery client, creating it on first use"""
+    global _celery
+    if _celery is None:
+        from celery import Celery
+
+        _celery = Celery("algorythmos_ai_agents_api", broker=REDIS_URL)
+        _celery.conf.update(task_serializer="json", accept_content=["json"])
+    return _celery
+
+
+def enqueue_runs(run_ids: Iterable[str]):
+    """Publish execute_workflow for each run over a single broker connection.
+
+    Blocking; call from the threadpool in async code.
+    """
+    celery = get_celery()
+    with celery.producer_or_acquire() as producer:
+        for run_id in run_ids:
+            celery.send_task(
+                EXECUTE_WORKFLOW_TASK, args=[run_id], producer=producer,
+                headers={PUBLISHED_AT_HEADER: time.time()},
+            )
@@ -0,0 +1,173 @@
+import ipaddress
+import logging
+import math
+import os
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from dotenv import load_dotenv
+
+from .redis_client import get_redis
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RUN_RATE_PER_SEC = float(os.getenv("RUN_RATE_PER_SEC", "5"))
+# Also the most runs one owner may have in a batch (see create_runs_batch)
+RUN_BURST = int(os.getenv("RUN_BURST", "100"))
+EMAIL_RATE_PER_SEC = float(os.getenv("EMAIL_RATE_PER_SEC", "1"))
+EMAIL_BURST = int(os.getenv("EMAIL_BURST", "20"))
+# Comma-separated addresses or networks of the proxies in front of the API,
+# e.g. the ingress controller's pod network. Their X-Forwarded-For is trusted.
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in os.getenv("TRUSTED_PROXIES", "").split(",") if network.strip()
+]
+
+# Admission control: refuse new runs while the broker queue is this deep
+# (0 disables). The queue is the Redis list Celery's default queue maps to.
+QUEUE_DEPTH_LIMIT = int(os.getenv("QUEUE_DEPTH_LIMIT", "10000"))
+QUEUE_RETRY_AFTER = int(os.getenv("QUEUE_RETRY_AFTER", "10"))
+CELERY_QUEUE = os.getenv("CELERY_QUEUE", "celery")
+
+# Refill and take in one round trip, for one or several identities at once:
+# KEYS are their buckets and ARGV[3..] the cost for each. Tokens are taken
+# from every bucket or from none. Time comes from the Redis server so all API
+# processes agree on it. Returns the seconds until every cost can be paid:
+# "0" when taken, "-1" when a cost exceeds the bucket size.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local available = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local cost = tonumber(ARGV[i + 2])
+    if cost > burst then
+        return "-1"
+    end
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    available[i] = tokens
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local tokens = available[i]
+    if wait == 0 then
+        tokens = tokens - tonumber(ARGV[i + 2])
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(burst / rate) + 1)
+end
+return tostring(wait)
+"""
+
+
+class TokenBucket:
+    """Per-identity token bucket stored in Redis.
+
+    Redis failures let the request through: losing the limiter briefly is
+    better than failing every write.
+    """
+
+    key_prefix = "ratelimit:"
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._script = None
+
+    async def wait_time(self, costs: Dict[str, int]) -> Optional[float]:
+        """Take ``costs[identity]`` tokens from every identity's bucket, or none.
+
+        Returns 0 if taken, the seconds until all of them can be, or None if
+        some cost can never be paid.
+        """
+        identities = list(costs)
+        if self._script is None:
+            self._script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+        try:
+            wait = float(await self._script(
+                keys=[f"{self.key_prefix}{self.name}:{identity}" for identity in identities],
+                args=[self.rate, self.burst, *(costs[identity] for identity in identities)],
+            ))
+        except Exception as exc:
+            logger.warning("rate limiter unavailable: %s", exc)
+            return 0.0
+        return None if wait < 0 else wait
+
+    async def enforce(self, identity: str, cost: int = 1):
+        """Raise 429 with Retry-After when ``identity`` is over its rate"""
+        await self.enforce_many({identity: cost})
+
+    async def enforce_many(self, costs: Dict[str, int]):
+        """Charge several identities atomically; one over its rate fails them all"""
+        if not RATE_LIMIT_ENABLED or not costs:
+            return
+        wait = await self.wait_time(costs)
+        if wait is None:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Request needs {max(costs.values())} {self.name} tokens; the limit is {self.burst}",
+            )
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many {self.name} requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+
+def client_address(request: Request) -> str:
+    """The caller's address, seen through any trusted proxies.
+
+    X-Forwarded-For is read from the right, and only while each hop was
+    added by a trusted proxy, so a client cannot choose its own address by
+    sending the header itself.
+    """
+    address = request.client.host if request.client else "unknown"
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",") if hop.strip()
+    ]
+    while hops and _trusted(address):
+        address = hops.pop()
+    return address
+
+
+def _trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+run_limiter = TokenBucket("runs", RUN_RATE_PER_SEC, RUN_BURST)
+email_limiter = TokenBucket("email", EMAIL_RATE_PER_SEC, EMAIL_BURST)
+
+
+async def admit_runs():
+    """Refuse new runs with 429 while the broker queue is over QUEUE_DEPTH_LIMIT"""
+    if not RATE_LIMIT_ENABLED or not QUEUE_DEPTH_LIMIT:
+        return
+    try:
+        depth = await get_redis().llen(CELERY_QUEUE)
+    except Exception as exc:
+        logger.warning("queue depth unavailable: %s", exc)
+        return
+    if depth >= QUEUE_DEPTH_LIMIT:
+        raise HTTPException(
+            status_code=429,
+            detail="Run queue is full",
+            headers={"Retry-After": str(QUEUE_RETRY_AFTER)},
+        )
@@ -0,0 +1,19 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+_client = None
+
+
+def get_redis():
+    """Return the process-wide asyncio Redis client, creating it on first use"""
+    global _client
+    if _client is None:
+        import redis.asyncio as redis
+
+        _client = redis.from_url(REDIS_URL, decode_responses=True)
+    return _client
@@ -0,0 +1,174 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .database import DB_MAX_OVERFLOW, DB_MODE, DB_POOL_SIZE, SyncSessionAdapter, _to_async_url, session_scope
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated replica URLs; with none configured every read goes to the
+# primary and the rest of this module is inert.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
+# After a successful write the client reads from the primary for this long
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+PRIMARY_PIN_COOKIE = "db_primary_until"
+
+# Zero when the replica has replayed everything it received; otherwise the
+# age of the last replayed transaction.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class Replica:
+    """One replica's engine, session factory and last measured lag"""
+
+    def __init__(self, url: str):
+        self.url = url
+        if DB_MODE == "async":
+            from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+            self.engine = create_async_engine(
+                _to_async_url(url), pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
+            )
+            self.sessionmaker = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        else:
+            self.engine = create_engine(url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+            self.sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.lag = 0.0
+        self.checked_at = float("-inf")
+        self._checking = asyncio.Lock()
+
+    async def _measure_lag(self) -> float:
+        if DB_MODE == "async":
+            async with self.engine.connect() as connection:
+                return float(await connection.scalar(REPLICA_LAG_SQL))
+
+        def measure():
+            with self.engine.connect() as connection:
+                return float(connection.scalar(REPLICA_LAG_SQL))
+
+        return await run_in_threadpool(measure)
+
+    async def current_lag(self) -> float:
+        """Lag in seconds, re-measured at most every REPLICA_LAG_CHECK_INTERVAL.
+
+        Concurrent callers use the previous value while one measures; an
+        unreachable replica reports infinite lag.
+        """
+        if time.monotonic() - self.checked_at < REPLICA_LAG_CHECK_INTERVAL or self._checking.locked():
+            return self.lag
+        async with self._checking:
+            try:
+                self.lag = await self._measure_lag()
+            except Exception as exc:
+                logger.warning("replica %s unavailable: %s", self.engine.url.host, exc)
+                self.lag = float("inf")
+            self.checked_at = time.monotonic()
+        return self.lag
+
+    async def dispose(self):
+        if DB_MODE == "async":
+            await self.engine.dispose()
+        else:
+            await run_in_threadpool(self.engine.dispose)
+
+
+class ReplicaSet:
+    """Round-robin over replicas that are within REPLICA_MAX_LAG_SECONDS"""
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._next = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+
+    async def pick(self) -> Optional[Replica]:
+        """A replica fresh enough to read from, or None to use the primary"""
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if await replica.current_lag() <= REPLICA_MAX_LAG_SECONDS:
+                return replica
+        return None
+
+    async def dispose(self):
+        await asyncio.gather(*(replica.dispose() for replica in self.replicas))
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+@asynccontextmanager
+async def read_session_scope(use_replica: bool = True):
+    """Like session_scope, but served by a replica when one is fresh enough"""
+    replica = await replica_set.pick() if use_replica else None
+    if replica is None:
+        async with session_scope() as db:
+            yield db
+    elif DB_MODE == "async":
+        async with replica.sessionmaker() as db:
+            yield db
+    else:
+        db = SyncSessionAdapter(replica.sessionmaker(expire_on_commit=False))
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+def pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_db(request: Request):
+    """Session for read-only routes; clients that just wrote stay on the primary"""
+    async with read_session_scope(use_replica=not pinned_to_primary(request)) as db:
+        yield db
+
+
+class PrimaryPinMiddleware:
+    """Set the read-your-writes cookie on every successful write"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not replica_set.replicas or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                until = time.time() + REPLICA_PIN_SECONDS
+                headers.append(
+                    "Set-Cookie",
+                    f"{PRIMARY_PIN_COOKIE}={until:.3f}; Max-Age={REPLICA_PIN_SECONDS}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
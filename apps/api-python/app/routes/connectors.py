@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Dict, Any
 
@@ -19,7 +19,7 @@ class ConnectorTestResponse(BaseModel):
 @router.post("/test", response_model=ConnectorTestResponse)
 async def test_connector(
     request: ConnectorTestRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Test a connector configuration"""
     try:
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Header, HTTPException, Request
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 
-from ..database import get_db
+from ..idempotency import idempotent
+from ..ratelimit import client_address, email_limiter
 
 router = APIRouter()
 
@@ -23,9 +23,21 @@ class EmailResponse(BaseModel):
 @router.post("/send", response_model=EmailResponse)
 async def send_email(
     email_request: EmailRequest,
-    db: Session = Depends(get_db)
+    request: Request,
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Send an email"""
+    # Direct sends have no workflow to take an owner from and the API has no
+    # authentication, so they are limited per client address (behind the
+    # ingress, the one it forwards; see TRUSTED_PROXIES).
+    identity = f"ip:{client_address(request)}"
+    return await idempotent(
+        f"email:{identity}", idempotency_key, email_request.model_dump_json(),
+        lambda: _send_email(email_request, identity), EmailResponse
+    )
+
+async def _send_email(email_request: EmailRequest, identity: str) -> EmailResponse:
+    await email_limiter.enforce(identity)
     try:
         # Here you would integrate with your email service
         # For now, we'll simulate sending
@@ -0,0 +1,156 @@
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Text, cast, select
+from typing import AsyncIterator, Optional
+from datetime import datetime
+import json
+import zlib
+
+from ..replicas import read_session_scope
+from .. import models
+
+router = APIRouter()
+
+# Rows are pulled from a server-side cursor in batches of this size, so
+# memory stays flat regardless of how many rows the export covers.
+EXPORT_BATCH_SIZE = 1000
+
+RUN_COLUMNS = [
+    models.Run.id,
+    models.Run.workflow_id,
+    models.Run.status,
+    models.Run.started_at,
+    models.Run.completed_at,
+    models.Run.error_message,
+    models.Run.created_at,
+]
+
+STEP_COLUMNS = [
+    models.RunStep.id,
+    models.RunStep.run_id,
+    models.RunStep.step_id,
+    models.RunStep.step_type,
+    models.RunStep.status,
+    models.RunStep.error_message,
+    models.RunStep.started_at,
+    models.RunStep.completed_at,
+    models.RunStep.created_at,
+]
+
+# JSONB payloads are read as text and spliced into the line verbatim instead
+# of being decoded and re-encoded for every row.
+STEP_PAYLOADS = {
+    "input_data": cast(models.RunStep.input_data, Text),
+    "output_data": cast(models.RunStep.output_data, Text),
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _run_line(row) -> str:
+    return json.dumps(dict(row), default=_json_default)
+
+
+def _step_line(row) -> str:
+    meta = {column.key: row[column.key] for column in STEP_COLUMNS}
+    head = json.dumps(meta, default=_json_default)[:-1]
+    payloads = "".join(
+        f', "{name}": {row[name] or "null"}' for name in STEP_PAYLOADS
+    )
+    return head + payloads + "}"
+
+
+async def _ndjson(statement, to_line) -> AsyncIterator[bytes]:
+    async with read_session_scope() as db:
+        result = await db.stream(statement)
+        async for rows in result.mappings().partitions(EXPORT_BATCH_SIZE):
+            yield ("\n".join(to_line(row) for row in rows) + "\n").encode()
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _export_response(chunks: AsyncIterator[bytes], filename: str, compress: bool) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.ndjson"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        chunks = _gzip(chunks)
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=headers)
+
+
+def _wants_gzip(compress: Optional[str], accept_encoding: Optional[str]) -> bool:
+    if compress is not None:
+        return compress == "gzip"
+    return "gzip" in (accept_encoding or "")
+
+
+@router.get("/runs")
+async def export_runs(
+    workflow_id: Optional[str] = None,
+    status: Optional[models.RunStatus] = None,
+    since: Optional[datetime] = Query(None, description="Runs created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Runs created before this time"),
+    compress: Optional[str] = Query(None, pattern="^(gzip|none)$"),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Stream runs as newline-delimited JSON"""
+    statement = select(*RUN_COLUMNS)
+    if workflow_id:
+        statement = statement.where(models.Run.workflow_id == workflow_id)
+    if status:
+        statement = statement.where(models.Run.status == status)
+    if since:
+        statement = statement.where(models.Run.created_at >= since)
+    if until:
+        statement = statement.where(models.Run.created_at < until)
+    statement = statement.order_by(models.Run.created_at, models.Run.id)
+
+    return _export_response(
+        _ndjson(statement, _run_line), "runs", _wants_gzip(compress, accept_encoding)
+    )
+
+
+@router.get("/steps")
+async def export_steps(
+    workflow_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+    status: Optional[models.StepStatus] = None,
+    since: Optional[datetime] = Query(None, description="Steps created at or after this time"),
+    until: Optional[datetime] = Query(None, description="Steps created before this time"),
+    include_payloads: bool = True,
+    compress: Optional[str] = Query(None, pattern="^(gzip|none)$"),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Stream run steps as newline-delimited JSON"""
+    columns = list(STEP_COLUMNS)
+    if include_payloads:
+        columns += [expression.label(name) for name, expression in STEP_PAYLOADS.items()]
+    statement = select(*columns)
+    if workflow_id:
+        statement = statement.join(models.Run, models.Run.id == models.RunStep.run_id).where(
+            models.Run.workflow_id == workflow_id
+        )
+    if run_id:
+        statement = statement.where(models.RunStep.run_id == run_id)
+    if status:
+        statement = statement.where(models.RunStep.status == status)
+    if since:
+        statement = statement.where(models.RunStep.created_at >= since)
+    if until:
+        statement = statement.where(models.RunStep.created_at < until)
+    statement = statement.order_by(models.RunStep.created_at, models.RunStep.id)
+
+    to_line = _step_line if include_payloads else _run_line
+    return _export_response(
+        _ndjson(statement, to_line), "steps", _wants_gzip(compress, accept_encoding)
+    )
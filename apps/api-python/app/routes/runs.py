@@ -1,67 +1,206 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional
+import asyncio
 import json
 import uuid
 
-from ..database import get_db
+from ..database import get_db, session_scope
+from ..replicas import get_read_db, pinned_to_primary, read_session_scope
+from ..events import RUN_EVENTS_KEEPALIVE, TERMINAL_RUN_STATUSES, publish_run_event, run_events
+from ..pagination import keyset, page_of
+from ..idempotency import idempotent
+from ..queue import WORKFLOW_RUN_LEASE, enqueue_runs
+from ..cache import workflow_cache
+from ..ratelimit import RATE_LIMIT_ENABLED, admit_runs, run_limiter
+from ..responses import FAST_JSON, FastJSONResponse, project, project_all
 from .. import models, schemas
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Run])
+RUN_FIELDS = list(schemas.Run.model_fields)
+STEP_FIELDS = list(schemas.RunStepView.model_fields)
+STEP_PAYLOAD_FIELDS = ["input_data", "output_data"]
+RUN_INCLUDES = {"steps", "payloads"}
+
+@router.get("/", response_model=schemas.RunPage)
 async def get_runs(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    workflow_id: Optional[str] = None,
+    status: Optional[models.RunStatus] = None,
+    step_output_has_key: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all runs"""
-    runs = db.query(models.Run).offset(skip).limit(limit).all()
-    return runs
+    query = select(models.Run)
+    if workflow_id:
+        query = query.where(models.Run.workflow_id == workflow_id)
+    if status:
+        query = query.where(models.Run.status == status)
+    if step_output_has_key:
+        query = query.where(
+            select(models.RunStep.id)
+            .where(
+                models.RunStep.run_id == models.Run.id,
+                models.RunStep.output_data.has_key(step_output_has_key),
+            )
+            .exists()
+        )
+
+    result = await db.scalars(keyset(query, models.Run, cursor, limit))
+    runs, next_cursor = page_of(result.all(), limit)
+    if FAST_JSON:
+        return FastJSONResponse({"items": project_all(runs, RUN_FIELDS), "next_cursor": next_cursor})
+    return {"items": runs, "next_cursor": next_cursor}
 
 @router.post("/", response_model=schemas.Run)
 async def create_run(
     run: schemas.RunCreate,
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Create a new run"""
+    """Create a new run and queue it for execution"""
+    # Retries with the same Idempotency-Key get the original run back
+    return await idempotent(
+        "runs", idempotency_key, run.model_dump_json(), lambda: _create_run(run, db), schemas.Run
+    )
+
+async def _create_run(run: schemas.RunCreate, db: AsyncSession) -> models.Run:
+    await admit_runs()
+    cached = await workflow_cache.get(run.workflow_id)
+    if cached is not None:
+        user_id = cached["body"]["user_id"]
+    else:
+        user_id = await db.scalar(
+            select(models.Workflow.user_id).where(models.Workflow.id == run.workflow_id)
+        )
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    await run_limiter.enforce(user_id)
+
     db_run = models.Run(
         id=str(uuid.uuid4()),
         workflow_id=run.workflow_id,
         status=models.RunStatus.QUEUED
     )
     db.add(db_run)
-    db.commit()
-    db.refresh(db_run)
+    await db.commit()
+    await db.refresh(db_run)
+    await run_in_threadpool(enqueue_runs, [db_run.id])
     return db_run
 
-@router.get("/{run_id}", response_model=schemas.RunWithSteps)
+@router.post("/batch", response_model=schemas.RunBatch)
+async def create_runs_batch(
+    batch: schemas.RunBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many runs in one statement and queue them in one broker round"""
+    await admit_runs()
+    workflow_ids = batch.all_workflow_ids()
+    owners = dict((await db.execute(
+        select(models.Workflow.id, models.Workflow.user_id)
+        .where(models.Workflow.id.in_(set(workflow_ids)))
+    )).all())
+    missing = sorted(set(workflow_ids) - set(owners))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Workflows not found: {', '.join(missing)}")
+    # Each run costs its owner one token, as if it had been posted alone.
+    # Owners are charged together so a rejected batch takes nobody's tokens.
+    costs = Counter(owners[workflow_id] for workflow_id in workflow_ids)
+    if RATE_LIMIT_ENABLED and max(costs.values()) > run_limiter.burst:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may hold at most {run_limiter.burst} runs per workflow owner",
+        )
+    await run_limiter.enforce_many(dict(costs))
+
+    rows = [
+        {"id": str(uuid.uuid4()), "workflow_id": workflow_id, "status": models.RunStatus.QUEUED}
+        for workflow_id in workflow_ids
+    ]
+    await db.execute(insert(models.Run).values(rows))
+    await db.commit()
+
+    run_ids = [row["id"] for row in rows]
+    await run_in_threadpool(enqueue_runs, run_ids)
+    return {"run_ids": run_ids}
+
+def _parse_list(value: Optional[str], allowed, name: str) -> List[str]:
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {name}: {', '.join(unknown)}")
+    return items
+
+@router.get("/{run_id}", response_model=schemas.RunView, response_model_exclude_unset=True)
 async def get_run(
     run_id: str,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated run fields to return"),
+    include: str = Query("steps,payloads", description="steps, payloads (step input/output)"),
+    steps_cursor: Optional[str] = None,
+    steps_limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific run with its steps"""
-    run = db.query(models.Run).filter(models.Run.id == run_id).first()
+    run_fields = _parse_list(fields, RUN_FIELDS, "fields") if fields else RUN_FIELDS
+    includes = _parse_list(include, RUN_INCLUDES, "include")
+    with_steps = "steps" in includes
+    step_fields = STEP_FIELDS if "payloads" in includes else [
+        name for name in STEP_FIELDS if name not in STEP_PAYLOAD_FIELDS
+    ]
+    # Payload columns are left out of the SELECT entirely unless requested
+    step_columns = [getattr(models.RunStep, name) for name in step_fields]
+
+    query = (
+        select(models.Run)
+        .options(load_only(*[getattr(models.Run, name) for name in run_fields]))
+        .where(models.Run.id == run_id)
+    )
+    if with_steps and steps_limit is None:
+        query = query.options(selectinload(models.Run.steps).load_only(*step_columns))
+
+    run = await db.scalar(query)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     
-    # Parse step data
-    for step in run.steps:
-        if step.input_data:
-            step.input_data = json.loads(step.input_data)
-        if step.output_data:
-            step.output_data = json.loads(step.output_data)
+    response = project(run, run_fields)
+    if with_steps:
+        if steps_limit is None:
+            steps = run.steps
+        else:
+            step_query = (
+                select(models.RunStep)
+                .options(load_only(*step_columns))
+                .where(models.RunStep.run_id == run_id)
+            )
+            result = await db.scalars(
+                keyset(step_query, models.RunStep, steps_cursor, steps_limit, descending=False)
+            )
+            steps, response["next_steps_cursor"] = page_of(result.all(), steps_limit)
+        response["steps"] = project_all(steps, step_fields)
     
-    return run
+    # The dict already holds exactly the projected fields, so the fast path
+    # can skip RunView validation without changing the response shape.
+    if FAST_JSON:
+        return FastJSONResponse(response)
+    return response
 
 @router.put("/{run_id}/status")
 async def update_run_status(
     run_id: str,
     status_update: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update run status"""
-    run = db.query(models.Run).filter(models.Run.id == run_id).first()
+    run = await db.get(models.Run, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     
@@ -71,6 +210,127 @@ async def update_run_status(
     if "error_message" in status_update:
         run.error_message = status_update["error_message"]
     
-    db.commit()
-    db.refresh(run)
+    await db.commit()
+    await db.refresh(run)
+    await publish_run_event(run_id, {"event": "run", "status": run.status.value, "error_message": run.error_message})
     return run
+
+RESUMABLE_STATUSES = [models.RunStatus.FAILED, models.RunStatus.CANCELLED]
+
+@router.post("/{run_id}/resume", response_model=schemas.Run)
+async def resume_run(
+    run_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue a failed, cancelled or stalled run again; the worker skips its completed steps.
+
+    A run is stalled when it has been RUNNING for over WORKFLOW_RUN_LEASE
+    seconds, which means its worker was lost.
+    """
+    await admit_runs()
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=WORKFLOW_RUN_LEASE)
+    # Conditional update, so concurrent resumes queue the run only once
+    resumed = await db.scalar(
+        update(models.Run)
+        .where(
+            models.Run.id == run_id,
+            or_(
+                models.Run.status.in_(RESUMABLE_STATUSES),
+                (models.Run.status == models.RunStatus.RUNNING) & (models.Run.started_at < stale_before),
+            ),
+        )
+        .values(status=models.RunStatus.QUEUED, error_message=None, completed_at=None, attempts=0)
+        .returning(models.Run.id)
+    )
+    if resumed is None:
+        run = await db.get(models.Run, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        raise HTTPException(status_code=409, detail=f"Run is {run.status.value}; only failed, cancelled or stalled runs can be resumed")
+    await db.commit()
+    await run_in_threadpool(enqueue_runs, [run_id])
+    await publish_run_event(run_id, {"event": "run", "status": models.RunStatus.QUEUED.value})
+    return await db.get(models.Run, run_id)
+
+SNAPSHOT_STEP_FIELDS = [name for name in STEP_FIELDS if name not in STEP_PAYLOAD_FIELDS]
+
+async def _run_snapshot(db: AsyncSession, run_id: str) -> Optional[dict]:
+    run = await db.scalar(
+        select(models.Run)
+        .options(selectinload(models.Run.steps).load_only(
+            *[getattr(models.RunStep, name) for name in SNAPSHOT_STEP_FIELDS]
+        ))
+        .where(models.Run.id == run_id)
+    )
+    if not run:
+        return None
+    snapshot = project(run, RUN_FIELDS)
+    snapshot["steps"] = project_all(run.steps, SNAPSHOT_STEP_FIELDS)
+    return jsonable_encoder(snapshot)
+
+async def _run_event_stream(run_id: str, snapshot: bool) -> AsyncIterator[Optional[dict]]:
+    """Yield run events until the run reaches a terminal status.
+
+    The channel is subscribed before the snapshot is read so no transition
+    can fall between the two; after that no queries are made. ``None`` is
+    yielded when the stream has been idle for RUN_EVENTS_KEEPALIVE seconds.
+    """
+    async with run_events.watch(run_id) as queue:
+        if snapshot:
+            async with session_scope() as db:
+                current = await _run_snapshot(db, run_id)
+            if current is None:
+                return
+            yield {"event": "snapshot", "run_id": run_id, **current}
+            if current["status"] in TERMINAL_RUN_STATUSES:
+                return
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), RUN_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            yield event
+            if event.get("event") == "run" and event.get("status") in TERMINAL_RUN_STATUSES:
+                return
+
+@router.get("/{run_id}/events")
+async def stream_run_events(
+    run_id: str,
+    request: Request,
+    snapshot: bool = True
+):
+    """Stream run and step status transitions as Server-Sent Events"""
+    # A short session rather than a dependency: those are only closed once
+    # the response ends, so every watcher would hold a pooled connection
+    async with read_session_scope(use_replica=not pinned_to_primary(request)) as db:
+        found = await db.get(models.Run, run_id)
+    if not found:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    async def events():
+        async for event in _run_event_stream(run_id, snapshot):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/{run_id}/ws")
+async def watch_run(websocket: WebSocket, run_id: str, snapshot: bool = True):
+    """Push run and step status transitions over a WebSocket"""
+    await websocket.accept()
+    try:
+        async for event in _run_event_stream(run_id, snapshot):
+            if event is None:
+                await websocket.send_json({"event": "keepalive"})
+            else:
+                await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
@@ -1,33 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 import json
 import uuid
 
 from ..database import get_db
+from ..replicas import get_read_db
+from ..pagination import keyset, page_of
+from ..responses import FAST_JSON, FastJSONResponse, project, project_all
 from .. import models, schemas
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.RunStep])
+STEP_FIELDS = list(schemas.RunStep.model_fields)
+
+@router.get("/", response_model=schemas.RunStepPage)
 async def get_steps(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    output_has_key: Optional[str] = None,
+    output_contains: Optional[str] = Query(None, description="JSON object the step output must contain"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all run steps"""
-    steps = db.query(models.RunStep).offset(skip).limit(limit).all()
-    for step in steps:
-        if step.input_data:
-            step.input_data = json.loads(step.input_data)
-        if step.output_data:
-            step.output_data = json.loads(step.output_data)
-    return steps
+    query = select(models.RunStep)
+    # Both filters are served by the GIN index on output_data
+    if output_has_key:
+        query = query.where(models.RunStep.output_data.has_key(output_has_key))
+    if output_contains:
+        try:
+            fragment = json.loads(output_contains)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="output_contains must be valid JSON")
+        query = query.where(models.RunStep.output_data.contains(fragment))
+
+    result = await db.scalars(keyset(query, models.RunStep, cursor, limit))
+    steps, next_cursor = page_of(result.all(), limit)
+    if FAST_JSON:
+        return FastJSONResponse({"items": project_all(steps, STEP_FIELDS), "next_cursor": next_cursor})
+    return {"items": steps, "next_cursor": next_cursor}
 
 @router.post("/", response_model=schemas.RunStep)
 async def create_step(
     step: schemas.RunStepCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new run step"""
     db_step = models.RunStep(
@@ -35,66 +52,43 @@ async def create_step(
         run_id=step.run_id,
         step_id=step.step_id,
         step_type=step.step_type,
-        input_data=json.dumps(step.input_data) if step.input_data else None,
+        input_data=step.input_data,
         status=models.StepStatus.PENDING
     )
     db.add(db_step)
-    db.commit()
-    db.refresh(db_step)
-    
-    # Parse input_data back to dict for response
-    if db_step.input_data:
-        db_step.input_data = json.loads(db_step.input_data)
-    
+    await db.commit()
+    await db.refresh(db_step)
     return db_step
 
 @router.get("/{step_id}", response_model=schemas.RunStep)
 async def get_step(
     step_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific run step"""
-    step = db.query(models.RunStep).filter(models.RunStep.id == step_id).first()
+    step = await db.get(models.RunStep, step_id)
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
     
-    # Parse data to dict
-    if step.input_data:
-        step.input_data = json.loads(step.input_data)
-    if step.output_data:
-        step.output_data = json.loads(step.output_data)
-    
+    if FAST_JSON:
+        return FastJSONResponse(project(step, STEP_FIELDS))
     return step
 
 @router.put("/{step_id}", response_model=schemas.RunStep)
 async def update_step(
     step_id: str,
     step_update: schemas.RunStepUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a run step"""
-    step = db.query(models.RunStep).filter(models.RunStep.id == step_id).first()
+    step = await db.get(models.RunStep, step_id)
     if not step:
         raise HTTPException(status_code=404, detail="Step not found")
     
     update_data = step_update.dict(exclude_unset=True)
-    
-    # Handle JSON fields
-    if "input_data" in update_data and update_data["input_data"]:
-        update_data["input_data"] = json.dumps(update_data["input_data"])
-    if "output_data" in update_data and update_data["output_data"]:
-        update_data["output_data"] = json.dumps(update_data["output_data"])
-    
     for field, value in update_data.items():
         setattr(step, field, value)
     
-    db.commit()
-    db.refresh(step)
-    
-    # Parse data back to dict for response
-    if step.input_data:
-        step.input_data = json.loads(step.input_data)
-    if step.output_data:
-        step.output_data = json.loads(step.output_data)
-    
+    await db.commit()
+    await db.refresh(step)
     return step
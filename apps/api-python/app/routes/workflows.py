@@ -1,97 +1,126 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 import uuid
 
+from ..cache import etag_matches, workflow_cache, workflow_etag
 from ..database import get_db
+from ..replicas import get_read_db
+from ..pagination import keyset, page_of
+from ..responses import FAST_JSON, FastJSONResponse, project_all
+from ..stats import STATS_WINDOWS, workflow_stats
 from .. import models, schemas
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Workflow])
+WORKFLOW_FIELDS = list(schemas.Workflow.model_fields)
+
+@router.get("/", response_model=schemas.WorkflowPage)
 async def get_workflows(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all workflows"""
-    workflows = db.query(models.Workflow).offset(skip).limit(limit).all()
-    for workflow in workflows:
-        workflow.definition = json.loads(workflow.definition)
-    return workflows
+    result = await db.scalars(keyset(select(models.Workflow), models.Workflow, cursor, limit))
+    workflows, next_cursor = page_of(result.all(), limit)
+    if FAST_JSON:
+        return FastJSONResponse({"items": project_all(workflows, WORKFLOW_FIELDS), "next_cursor": next_cursor})
+    return {"items": workflows, "next_cursor": next_cursor}
 
 @router.post("/", response_model=schemas.Workflow)
 async def create_workflow(
     workflow: schemas.WorkflowCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new workflow"""
     db_workflow = models.Workflow(
         id=str(uuid.uuid4()),
         name=workflow.name,
         description=workflow.description,
-        definition=json.dumps(workflow.definition),
+        definition=workflow.definition,
         is_active=workflow.is_active,
         user_id=workflow.user_id
     )
     db.add(db_workflow)
-    db.commit()
-    db.refresh(db_workflow)
-    
-    # Parse definition back to dict for response
-    db_workflow.definition = json.loads(db_workflow.definition)
+    await db.commit()
+    await db.refresh(db_workflow)
     return db_workflow
 
+CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
 @router.get("/{workflow_id}", response_model=schemas.Workflow)
 async def get_workflow(
     workflow_id: str,
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific workflow"""
-    workflow = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
-    if not workflow:
+    # Misses read the primary: a lagging replica could refill the cache with
+    # a version older than the write that just invalidated it.
+    cached = await workflow_cache.get(workflow_id)
+    if cached is None:
+        workflow = await db.get(models.Workflow, workflow_id)
+        if not workflow:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        
+        cached = {
+            "etag": workflow_etag(workflow),
+            "body": schemas.Workflow.model_validate(workflow).model_dump(mode="json"),
+        }
+        await workflow_cache.set(workflow_id, cached)
+    
+    headers = {"ETag": cached["etag"], **CACHE_HEADERS}
+    if etag_matches(if_none_match, cached["etag"]):
+        return Response(status_code=304, headers=headers)
+    response_class = FastJSONResponse if FAST_JSON else JSONResponse
+    return response_class(cached["body"], headers=headers)
+
+@router.get("/{workflow_id}/stats", response_model=schemas.WorkflowStats)
+async def get_workflow_stats(
+    workflow_id: str,
+    window: str = Query("24h", pattern="^(" + "|".join(STATS_WINDOWS) + ")$"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Run and step outcomes and duration percentiles over a recent window"""
+    if await workflow_cache.get(workflow_id) is None and not await db.get(models.Workflow, workflow_id):
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    # Parse definition to dict
-    workflow.definition = json.loads(workflow.definition)
-    return workflow
+    return await workflow_stats(db, workflow_id, window)
 
 @router.put("/{workflow_id}", response_model=schemas.Workflow)
 async def update_workflow(
     workflow_id: str,
     workflow_update: schemas.WorkflowUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a workflow"""
-    workflow = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
+    workflow = await db.get(models.Workflow, workflow_id)
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
     update_data = workflow_update.dict(exclude_unset=True)
-    if "definition" in update_data:
-        update_data["definition"] = json.dumps(update_data["definition"])
-    
     for field, value in update_data.items():
         setattr(workflow, field, value)
     
-    db.commit()
-    db.refresh(workflow)
-    
-    # Parse definition to dict
-    workflow.definition = json.loads(workflow.definition)
+    await db.commit()
+    await db.refresh(workflow)
+    await workflow_cache.invalidate(workflow_id)
     return workflow
 
 @router.delete("/{workflow_id}")
 async def delete_workflow(
     workflow_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a workflow"""
-    workflow = db.query(models.Workflow).filter(models.Workflow.id == workflow_id).first()
+    workflow = await db.get(models.Workflow, workflow_id)
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    db.delete(workflow)
-    db.commit()
+    await db.delete(workflow)
+    await db.commit()
+    await workflow_cache.invalidate(workflow_id)
     return {"message": "Workflow deleted successfully"}
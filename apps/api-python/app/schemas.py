@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from .models import RunStatus, StepStatus, StepType
@@ -51,6 +51,29 @@ class RunBase(BaseModel):
 class RunCreate(RunBase):
     pass
 
+RUN_BATCH_MAX = 1000
+
+class RunBatchCreate(BaseModel):
+    """Either a list of workflow ids or a list of run payloads"""
+    workflow_ids: Optional[List[str]] = Field(None, max_length=RUN_BATCH_MAX)
+    runs: Optional[List[RunCreate]] = Field(None, max_length=RUN_BATCH_MAX)
+
+    @model_validator(mode="after")
+    def exactly_one_source(self):
+        if (self.workflow_ids is None) == (self.runs is None):
+            raise ValueError("Provide exactly one of workflow_ids or runs")
+        if not (self.workflow_ids or self.runs):
+            raise ValueError("Batch must contain at least one run")
+        return self
+
+    def all_workflow_ids(self) -> List[str]:
+        if self.workflow_ids is not None:
+            return self.workflow_ids
+        return [run.workflow_id for run in self.runs]
+
+class RunBatch(BaseModel):
+    run_ids: List[str]
+
 class Run(RunBase):
     id: str
     status: RunStatus
@@ -97,3 +120,62 @@ class WorkflowWithRuns(Workflow):
 
 class RunWithSteps(Run):
     steps: List[RunStep] = []
+
+# Projected views: every field is optional and unset fields are dropped from
+# the response, so clients only receive what they asked for.
+class RunStepView(BaseModel):
+    id: Optional[str] = None
+    run_id: Optional[str] = None
+    step_id: Optional[str] = None
+    step_type: Optional[StepType] = None
+    status: Optional[StepStatus] = None
+    input_data: Optional[Dict[str, Any]] = None
+    output_data: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+class RunView(BaseModel):
+    id: Optional[str] = None
+    workflow_id: Optional[str] = None
+    status: Optional[RunStatus] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    steps: Optional[List[RunStepView]] = None
+    next_steps_cursor: Optional[str] = None
+
+# Keyset-paginated listings
+class WorkflowPage(BaseModel):
+    items: List[Workflow]
+    next_cursor: Optional[str] = None
+
+class RunPage(BaseModel):
+    items: List[Run]
+    next_cursor: Optional[str] = None
+
+class RunStepPage(BaseModel):
+    items: List[RunStep]
+    next_cursor: Optional[str] = None
+
+# Workflow statistics, served from the rollup tables
+class DurationStats(BaseModel):
+    avg: Optional[float] = None
+    p50: Optional[int] = None
+    p95: Optional[int] = None
+    p99: Optional[int] = None
+
+class OutcomeStats(BaseModel):
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    success_rate: Optional[float] = None
+    duration_ms: DurationStats = DurationStats()
+
+class WorkflowStats(BaseModel):
+    workflow_id: str
+    window: str
+    since: datetime
+    runs: OutcomeStats
+    steps: Dict[str, OutcomeStats] = {}
@@ -0,0 +1,86 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+# Windows the stats endpoint answers for. The rollups hold one row per
+# bucket, so the rows read depend on the window, never on run volume.
+STATS_WINDOWS = {
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+RUN_SUBJECT = "run"
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+def percentile(histogram: List[Tuple[int, int]], quantile: float) -> Optional[int]:
+    """Upper bound of the bucket holding ``quantile``; histogram is (le_ms, count) sorted by le_ms"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    rank = quantile * total
+    seen = 0
+    for le_ms, count in histogram:
+        seen += count
+        if seen >= rank:
+            return le_ms
+    return histogram[-1][0]
+
+
+def _outcome(by_status: Dict[str, int], duration_sum: int, histogram: List[Tuple[int, int]]) -> dict:
+    total = sum(by_status.values())
+    finished = by_status.get("COMPLETED", 0) + by_status.get("FAILED", 0)
+    timed = sum(count for _, count in histogram)
+    return {
+        "total": total,
+        "by_status": by_status,
+        "success_rate": by_status.get("COMPLETED", 0) / finished if finished else None,
+        "duration_ms": {
+            "avg": duration_sum / timed if timed else None,
+            **{name: percentile(histogram, quantile) for name, quantile in PERCENTILES.items()},
+        },
+    }
+
+
+async def workflow_stats(db: AsyncSession, workflow_id: str, window: str) -> dict:
+    since = datetime.now(timezone.utc) - STATS_WINDOWS[window]
+    rollup, histogram = models.RunStatsRollup, models.RunDurationHistogram
+
+    counts = await db.execute(
+        select(rollup.subject, rollup.status, func.sum(rollup.count), func.sum(rollup.duration_ms_sum))
+        .where(rollup.workflow_id == workflow_id, rollup.bucket_start >= since)
+        .group_by(rollup.subject, rollup.status)
+    )
+    buckets = await db.execute(
+        select(histogram.subject, histogram.le_ms, func.sum(histogram.count))
+        .where(histogram.workflow_id == workflow_id, histogram.bucket_start >= since)
+        .group_by(histogram.subject, histogram.le_ms)
+        .order_by(histogram.subject, histogram.le_ms)
+    )
+
+    by_status: Dict[str, Dict[str, int]] = defaultdict(dict)
+    duration_sums: Dict[str, int] = defaultdict(int)
+    for subject, status, count, duration_sum in counts:
+        by_status[subject][status] = int(count)
+        duration_sums[subject] += int(duration_sum)
+    histograms: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    for subject, le_ms, count in buckets:
+        histograms[subject].append((int(le_ms), int(count)))
+
+    outcomes = {
+        subject: _outcome(by_status[subject], duration_sums[subject], histograms[subject])
+        for subject in set(by_status) | set(histograms)
+    }
+    return {
+        "workflow_id": workflow_id,
+        "window": window,
+        "since": since,
+        "runs": outcomes.pop(RUN_SUBJECT, _outcome({}, 0, [])),
+        "steps": outcomes,
+    }
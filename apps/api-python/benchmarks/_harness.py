@@ -0,0 +1,101 @@
+"""Shared helpers for the API benchmarks.
+
+Run benchmarks from ``apps/api-python`` so ``app.main`` is importable::
+
+    pip install -r requirements.txt -r benchmarks/requirements.txt
+    python -m benchmarks.bench_db_modes
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+
+@contextmanager
+def api_server(port: int, env: Optional[Dict[str, str]] = None, ready_path: str = "/health"):
+    """Start uvicorn in a subprocess and wait until it answers ``ready_path``"""
+    proc_env = {**os.environ, **(env or {})}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=proc_env,
+    )
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}{ready_path}")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> float:
+    """Poll ``url`` until it returns 200; return the seconds waited"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+async def _load(base_url: str, path: str, total: int, concurrency: int, headers=None) -> List[float]:
+    latencies: List[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{path} returned {response.status_code}")
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def run_load(base_url: str, path: str, total: int, concurrency: int, headers=None) -> Dict[str, float]:
+    """Fire ``total`` GETs with ``concurrency`` in flight; return rps and latency percentiles"""
+    started = time.perf_counter()
+    latencies = asyncio.run(_load(base_url, path, total, concurrency, headers))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed)
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "rps": len(ordered) / elapsed,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+    }
+
+
+def print_table(rows: List[Dict[str, object]]):
+    if not rows:
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(_fmt(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row[c]).ljust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
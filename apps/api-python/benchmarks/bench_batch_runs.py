@@ -0,0 +1,84 @@
+"""Measure runs enqueued per second: one POST per run vs POST /api/runs/batch.
+
+Seeds a benchmark user and workflow through the sync engine, then submits
+the same number of runs both ways. Every run is published to the broker, so
+point REDIS_URL at a scratch database (e.g. redis://localhost:6379/15).
+
+    python -m benchmarks.bench_batch_runs --runs 5000 --batch-size 500
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from sqlalchemy import text
+
+from ._harness import api_server, print_table
+
+
+def seed_workflow() -> str:
+    from app.database import engine
+
+    user_id = f"bench-{uuid.uuid4()}"
+    workflow_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, email, name) VALUES (:id, :email, 'bench')"),
+            {"id": user_id, "email": f"{user_id}@bench.local"},
+        )
+        conn.execute(
+            text("""
+                INSERT INTO workflows (id, name, definition, is_active, user_id)
+                VALUES (:id, 'bench', CAST(:definition AS JSONB), true, :user_id)
+            """),
+            {"id": workflow_id, "definition": '{"steps": []}', "user_id": user_id},
+        )
+    return workflow_id
+
+
+async def submit(base_url: str, payloads, path: str, concurrency: int) -> float:
+    queue: asyncio.Queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+    limits = httpx.Limits(max_connections=concurrency)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        async def worker():
+            while not queue.empty():
+                response = await client.post(path, json=queue.get_nowait())
+                response.raise_for_status()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    workflow_id = seed_workflow()
+    single = [{"workflow_id": workflow_id}] * args.runs
+    batches = [
+        {"workflow_ids": [workflow_id] * min(args.batch_size, args.runs - start)}
+        for start in range(0, args.runs, args.batch_size)
+    ]
+
+    rows = []
+    # Measures enqueue throughput, not the per-owner limit every run here shares
+    with api_server(args.port, env={"RATE_LIMIT_ENABLED": "false"}) as base_url:
+        elapsed = asyncio.run(submit(base_url, single, "/api/runs/", args.concurrency))
+        rows.append({"mode": "single", "runs": args.runs, "seconds": elapsed, "runs_per_sec": args.runs / elapsed})
+        elapsed = asyncio.run(submit(base_url, batches, "/api/runs/batch", args.concurrency))
+        rows.append({"mode": f"batch({args.batch_size})", "runs": args.runs, "seconds": elapsed, "runs_per_sec": args.runs / elapsed})
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Compare the async and sync database paths under concurrent load.
+
+Starts the API once per ``DB_MODE`` against the configured ``DATABASE_URL``
+and reports requests/sec and p50/p99 latency for the same read-heavy route.
+
+    python -m benchmarks.bench_db_modes --requests 5000 --concurrency 128
+"""
+
+import argparse
+
+from ._harness import api_server, print_table, run_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/api/workflows/?limit=20")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--modes", default="async,sync")
+    args = parser.parse_args()
+
+    rows = []
+    for mode in args.modes.split(","):
+        with api_server(args.port, env={"DB_MODE": mode}) as base_url:
+            run_load(base_url, args.path, min(200, args.requests), args.concurrency)  # warm up
+            stats = run_load(base_url, args.path, args.requests, args.concurrency)
+        rows.append({"mode": mode, **stats})
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
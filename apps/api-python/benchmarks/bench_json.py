@@ -0,0 +1,98 @@
+"""Compare CPU per request for the default and FAST_JSON response paths.
+
+Runs in process with no database: builds transient run steps carrying
+``--payload-kb`` of AI output each and measures process CPU time to turn them
+into a response body, first the way FastAPI does it by default (validate
+against the response model, dump, json.dumps), then the FAST_JSON way
+(project to dicts, orjson). Compression cost and ratio are reported per
+encoding for the same body.
+
+    python -m benchmarks.bench_json --steps 20 --payload-kb 256
+"""
+
+import argparse
+import gzip
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from pydantic import TypeAdapter
+
+from app import models, schemas
+from app.compression import COMPRESS_BROTLI_QUALITY, COMPRESS_GZIP_LEVEL, brotli
+from app.responses import FastJSONResponse, project_all
+from app.routes.steps import STEP_FIELDS
+
+from ._harness import print_table
+
+
+def make_steps(count: int, payload_kb: int):
+    text = ("The quick brown fox jumps over the lazy dog. " * 24)[:1024]
+    now = datetime.now(timezone.utc)
+    run_id = str(uuid.uuid4())
+    return [
+        models.RunStep(
+            id=str(uuid.uuid4()),
+            run_id=run_id,
+            step_id=f"s{i}",
+            step_type=models.StepType.AI,
+            status=models.StepStatus.COMPLETED,
+            input_data={"prompt": text, "model": "gpt-4"},
+            output_data={"success": True, "response": text * payload_kb, "tokens_used": 1234},
+            started_at=now,
+            completed_at=now,
+            created_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def default_body(page_adapter, steps) -> bytes:
+    page = page_adapter.validate_python({"items": steps, "next_cursor": None}, from_attributes=True)
+    content = page_adapter.dump_python(page, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def fast_body(steps) -> bytes:
+    return FastJSONResponse({"items": project_all(steps, STEP_FIELDS), "next_cursor": None}).body
+
+
+def cpu_ms(fn, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--payload-kb", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    steps = make_steps(args.steps, args.payload_kb)
+    page_adapter = TypeAdapter(schemas.RunStepPage)
+    body = fast_body(steps)
+
+    print_table([
+        {"path": "default", "cpu_ms": cpu_ms(lambda: default_body(page_adapter, steps), args.repeat),
+         "bytes": len(default_body(page_adapter, steps))},
+        {"path": "fast_json", "cpu_ms": cpu_ms(lambda: fast_body(steps), args.repeat), "bytes": len(body)},
+    ])
+    print()
+
+    encoders = {"gzip": lambda: gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL)}
+    if brotli is not None:
+        encoders["br"] = lambda: brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    print_table([
+        {"encoding": name, "cpu_ms": cpu_ms(encode, args.repeat), "ratio": len(body) / len(encode())}
+        for name, encode in encoders.items()
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure API cold start with and without startup DDL.
+
+For each ``DB_CREATE_ALL`` setting reports the time to import ``app.main``,
+the time until ``/health`` first answers and the time until ``/ready``
+reports the warmed pool, all against the configured ``DATABASE_URL``.
+
+    python -m benchmarks.bench_startup --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from ._harness import print_table, wait_until_ready
+
+
+def import_seconds(env) -> float:
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def startup_seconds(env, port: int):
+    """Seconds from process launch to the first /health and to /ready"""
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}/health")
+        first_request = time.perf_counter() - started
+        wait_until_ready(f"http://127.0.0.1:{port}/ready")
+        ready = time.perf_counter() - started
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return first_request, ready
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--create-all", default="true,false")
+    args = parser.parse_args()
+
+    rows = []
+    for create_all in args.create_all.split(","):
+        env = {**os.environ, "DB_CREATE_ALL": create_all}
+        imports, firsts, readies = [], [], []
+        for _ in range(args.repeat):
+            imports.append(import_seconds(env))
+            first_request, ready = startup_seconds(env, args.port)
+            firsts.append(first_request)
+            readies.append(ready)
+        rows.append({
+            "create_all": create_all,
+            "import_ms": statistics.median(imports) * 1000,
+            "first_request_ms": statistics.median(firsts) * 1000,
+            "ready_ms": statistics.median(readies) * 1000,
+        })
+
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Provider and HTTP clients shared by every runner in a worker process.
+
+Runners are built per task and per workflow run, but their clients live
+here so consecutive steps reuse keep-alive connections (and SMTP sessions,
+see smtp_pool) instead of paying for a new TCP and TLS handshake each time.
+Connections must not be shared across a fork, so each prefork child builds
+its own registry in worker_process_init, and a pid check covers any other
+fork.
+"""
+
+import os
+import threading
+
+import anthropic
+import httpx
+import openai
+import requests
+from celery import signals
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from .smtp_pool import SmtpPool
+
+load_dotenv()
+
+CONNECTOR_TIMEOUT = float(os.getenv("CONNECTOR_TIMEOUT", "30"))
+# Hosts whose pools are kept, and connections kept per host
+CONNECTOR_MAX_CONNECTIONS = int(os.getenv("CONNECTOR_MAX_CONNECTIONS", "100"))
+CONNECTOR_MAX_CONNECTIONS_PER_HOST = int(os.getenv("CONNECTOR_MAX_CONNECTIONS_PER_HOST", "10"))
+# Each provider client talks to a single host
+PROVIDER_MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "20"))
+
+
+class Clients:
+    """One process's clients, each built on first use.
+
+    requests.Session, the provider clients and the SMTP pool are all safe to
+    share between the threads of a step pool or a threads worker pool.
+    Building lazily means a process only needs credentials for the
+    providers its steps use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = {}
+
+    @property
+    def http(self) -> requests.Session:
+        return self._get("http", self._session)
+
+    @property
+    def openai(self) -> openai.OpenAI:
+        return self._get("openai", lambda: openai.OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), http_client=self._provider_http()
+        ))
+
+    @property
+    def anthropic(self) -> anthropic.Anthropic:
+        return self._get("anthropic", lambda: anthropic.Anthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"), http_client=self._provider_http()
+        ))
+
+    @property
+    def smtp(self) -> SmtpPool:
+        return self._get("smtp", SmtpPool)
+
+    def _get(self, name, build):
+        with self._lock:
+            if name not in self._built:
+                self._built[name] = build()
+            return self._built[name]
+
+    @staticmethod
+    def _session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=CONNECTOR_MAX_CONNECTIONS, pool_maxsize=CONNECTOR_MAX_CONNECTIONS_PER_HOST
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @staticmethod
+    def _provider_http() -> httpx.Client:
+        return httpx.Client(limits=httpx.Limits(
+            max_connections=PROVIDER_MAX_CONNECTIONS, max_keepalive_connections=PROVIDER_MAX_CONNECTIONS
+        ))
+
+
+_lock = threading.Lock()
+_clients = None
+_pid = None
+
+
+def get_clients() -> Clients:
+    global _clients, _pid
+    with _lock:
+        if _clients is None or _pid != os.getpid():
+            _clients = Clients()
+            _pid = os.getpid()
+        return _clients
+
+
+@signals.worker_process_init.connect
+def _init_clients(**kwargs):
+    # A fresh registry per child; nothing inherited from the parent is reused
+    get_clients()
@@ -0,0 +1,36 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict
+
+import redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Must match RUN_CHANNEL_PREFIX in apps/api-python/app/events.py
+RUN_CHANNEL_PREFIX = "run-events:"
+
+_client = None
+
+
+def get_redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL)
+    return _client
+
+
+def publish_run_event(run_id: str, event: Dict[str, Any]):
+    """Publish a run or step status transition to live watchers.
+
+    Watchers are optional, so delivery is best-effort: a Redis hiccup must
+    never fail the step that produced the event.
+    """
+    payload = {"run_id": run_id, "at": datetime.utcnow().isoformat(), **event}
+    try:
+        get_redis().publish(f"{RUN_CHANNEL_PREFIX}{run_id}", json.dumps(payload, default=str))
+    except redis.RedisError:
+        pass
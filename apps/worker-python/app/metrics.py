@@ -0,0 +1,108 @@
+"""Prometheus metrics for the Celery worker.
+
+Tasks run in prefork children, so metrics use prometheus_client's
+multiprocess mode: every process writes to PROMETHEUS_MULTIPROC_DIR and the
+worker's main process serves the merged view on WORKER_METRICS_PORT.
+"""
+
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# prometheus_client picks its storage mode at import time
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/worker-metrics")
+MULTIPROC_DIR = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+os.makedirs(MULTIPROC_DIR, exist_ok=True)
+
+from celery import signals  # noqa: E402
+from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess, start_http_server  # noqa: E402
+
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9808"))
+# Must match PUBLISHED_AT_HEADER in apps/api-python/app/queue.py
+PUBLISHED_AT_HEADER = "published_at"
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+TASK_DURATION = Histogram(
+    "worker_task_duration_seconds", "Task execution time", ["task", "state"], buckets=DURATION_BUCKETS
+)
+TASK_QUEUE_WAIT = Histogram(
+    "worker_task_queue_wait_seconds", "Time from publish to task start", ["task"], buckets=DURATION_BUCKETS
+)
+TASK_RETRIES = Counter("worker_task_retries_total", "Task retries scheduled", ["task"])
+STEP_DURATION = Histogram(
+    "worker_step_duration_seconds", "Workflow step execution time", ["step_type", "status"],
+    buckets=DURATION_BUCKETS,
+)
+PROVIDER_LATENCY = Histogram(
+    "worker_provider_request_duration_seconds", "Latency of calls to AI providers and connectors",
+    ["provider", "outcome"], buckets=DURATION_BUCKETS,
+)
+AI_CACHE_LOOKUPS = Counter(
+    "worker_ai_cache_lookups_total", "AI response cache lookups by the tier that answered",
+    ["provider", "result"],
+)
+
+_task_started = {}
+
+
+@contextmanager
+def observe_provider(provider: str):
+    """Time a call to an external provider; exceptions count as errors"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        PROVIDER_LATENCY.labels(provider, outcome).observe(time.perf_counter() - started)
+
+
+@signals.before_task_publish.connect
+def _stamp_published_at(headers=None, **kwargs):
+    # Covers beat, retries and tasks sent from tasks; the API sets it itself
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@signals.task_prerun.connect
+def _task_prerun(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    if published_at is None:
+        published_at = (task.request.headers or {}).get(PUBLISHED_AT_HEADER)
+    if published_at is not None:
+        TASK_QUEUE_WAIT.labels(task.name).observe(max(0.0, time.time() - float(published_at)))
+
+
+@signals.task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@signals.task_retry.connect
+def _task_retry(sender=None, **kwargs):
+    TASK_RETRIES.labels(sender.name).inc()
+
+
+@signals.worker_init.connect
+def _start_exporter(**kwargs):
+    # Files left by a previous worker would be merged into the new totals
+    shutil.rmtree(MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    if WORKER_METRICS_PORT:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(WORKER_METRICS_PORT, registry=registry)
+
+
+@signals.worker_process_shutdown.connect
+def _mark_process_dead(pid=None, **kwargs):
+    multiprocess.mark_process_dead(pid or os.getpid())
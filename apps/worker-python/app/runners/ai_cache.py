@@ -0,0 +1,126 @@
+"""Opt-in cache of AI step responses.
+
+A step enables it with ``"cache": true`` or ``"cache": {"ttl": 3600,
+"scope": "workflow"}`` in its config. Entries are keyed on the provider,
+model, prompt, temperature and max_tokens, plus the workflow or run id for
+the narrower scopes. Lookups try a per-process LRU first, bounded by
+AI_CACHE_MAX_BYTES of serialized responses, then Redis, which is shared by
+all workers and evicts under its own maxmemory policy. Only successful
+responses are stored. Redis errors count as misses.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+from dotenv import load_dotenv
+
+from ..events import get_redis
+from ..metrics import AI_CACHE_LOOKUPS
+
+load_dotenv()
+
+AI_CACHE_TTL = int(os.getenv("AI_CACHE_TTL", "3600"))
+AI_CACHE_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+AI_CACHE_PREFIX = "ai-cache:"
+CACHE_SCOPES = ("global", "workflow", "run")
+
+
+class LocalCache:
+    """Thread-safe LRU of serialized responses with per-entry expiry"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str, ttl: int):
+        if len(value) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+
+    def _drop(self, key: str):
+        _, value = self.entries.pop(key)
+        self.size -= len(value)
+
+
+_local = LocalCache(AI_CACHE_MAX_BYTES)
+
+
+def cache_key(settings: Any, provider: str, model: str, prompt: str, temperature: float,
+              max_tokens: int, scopes: Dict[str, str]) -> Optional[Tuple[str, int]]:
+    """The cache key and TTL for a step's ``cache`` setting, or None if it is not cached.
+
+    ``scopes`` maps "workflow" and "run" to the ids of the current run; a
+    scope that cannot be resolved disables caching rather than widening it.
+    """
+    if not settings:
+        return None
+    if settings is True:
+        settings = {}
+    scope = settings.get("scope", "global")
+    if scope not in CACHE_SCOPES:
+        raise ValueError(f"Unknown cache scope: {scope}")
+    owner = ""
+    if scope != "global":
+        owner = scopes.get(scope)
+        if not owner:
+            return None
+    material = json.dumps(
+        [provider, model, prompt, temperature, max_tokens, scope, owner], separators=(",", ":")
+    )
+    key = AI_CACHE_PREFIX + hashlib.sha256(material.encode()).hexdigest()
+    return key, int(settings.get("ttl", AI_CACHE_TTL))
+
+
+def lookup(key: str, provider: str) -> Optional[Dict[str, Any]]:
+    value = _local.get(key)
+    result = "local_hit"
+    if value is None:
+        try:
+            stored, remaining = get_redis().pipeline(transaction=False).get(key).ttl(key).execute()
+        except redis.RedisError:
+            stored, remaining = None, -1
+        if stored is None:
+            AI_CACHE_LOOKUPS.labels(provider, "miss").inc()
+            return None
+        value = stored.decode()
+        result = "redis_hit"
+        # Keep the local copy no longer than Redis has left
+        if remaining > 0:
+            _local.put(key, value, remaining)
+    AI_CACHE_LOOKUPS.labels(provider, result).inc()
+    return {**json.loads(value), "cached": True}
+
+
+def store(key: str, ttl: int, response: Dict[str, Any]):
+    value = json.dumps(response)
+    _local.put(key, value, ttl)
+    try:
+        get_redis().set(key, value, ex=ttl)
+    except redis.RedisError:
+        pass
@@ -1,19 +1,48 @@
-import os
 import json
-from typing import Dict, Any
-import openai
-from anthropic import Anthropic
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
+from . import ai_cache
+from ..clients import get_clients
+from ..metrics import observe_provider
+
 load_dotenv()
 
+def openai_result(response, model: str) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "response": response.choices[0].message.content,
+        "usage": {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens
+        },
+        "model": model
+    }
+
+def anthropic_result(response, model: str) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "response": response.content[0].text,
+        "usage": {
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens
+        },
+        "model": model
+    }
+
 class AIRunner:
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        clients = get_clients()
+        self.openai_client = clients.openai
+        self.anthropic_client = clients.anthropic
     
-    def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute AI step"""
+    def execute(self, input_data: Dict[str, Any], scopes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Execute AI step.
+
+        ``scopes`` holds the workflow and run ids for steps whose ``cache``
+        setting is scoped to them (see ai_cache).
+        """
         try:
             step_type = input_data.get("type", "openai")
             prompt = input_data.get("prompt", "")
@@ -22,14 +51,26 @@ class AIRunner:
             temperature = input_data.get("temperature", 0.7)
             
             if step_type == "openai":
-                return self._execute_openai(prompt, model, max_tokens, temperature)
+                execute = self._execute_openai
             elif step_type == "anthropic":
-                return self._execute_anthropic(prompt, model, max_tokens, temperature)
+                execute = self._execute_anthropic
             else:
                 return {
                     "success": False,
                     "error": f"Unknown AI provider: {step_type}"
                 }
+            
+            cache = ai_cache.cache_key(
+                input_data.get("cache"), step_type, model, prompt, temperature, max_tokens, scopes or {}
+            )
+            if cache is not None:
+                cached = ai_cache.lookup(cache[0], step_type)
+                if cached is not None:
+                    return cached
+            result = execute(prompt, model, max_tokens, temperature)
+            if cache is not None and result.get("success", False):
+                ai_cache.store(*cache, result)
+            return result
                 
         except Exception as e:
             return {
@@ -40,23 +81,15 @@ class AIRunner:
     def _execute_openai(self, prompt: str, model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
         """Execute OpenAI request"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
+            with observe_provider("openai"):
+                response = self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
             
-            return {
-                "success": True,
-                "response": response.choices[0].message.content,
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
-                },
-                "model": model
-            }
+            return openai_result(response, model)
         except Exception as e:
             return {
                 "success": False,
@@ -66,22 +99,15 @@ class AIRunner:
     def _execute_anthropic(self, prompt: str, model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
         """Execute Anthropic request"""
         try:
-            response = self.anthropic_client.messages.create(
-                model=model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            with observe_provider("anthropic"):
+                response = self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    messages=[{"role": "user", "content": prompt}]
+                )
             
-            return {
-                "success": True,
-                "response": response.content[0].text,
-                "usage": {
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens
-                },
-                "model": model
-            }
+            return anthropic_result(response, model)
         except Exception as e:
             return {
                 "success": False,
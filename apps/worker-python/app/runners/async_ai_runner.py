@@ -0,0 +1,91 @@
+import asyncio
+import os
+from typing import Dict, Any, Optional
+import openai
+from anthropic import AsyncAnthropic
+from dotenv import load_dotenv
+
+from . import ai_cache
+from .ai_runner import anthropic_result, openai_result
+from ..metrics import observe_provider
+
+load_dotenv()
+
+class AsyncAIRunner:
+    """AIRunner on the providers' async clients, for the asyncio engine"""
+
+    def __init__(self):
+        self.openai_client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.anthropic_client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    
+    async def execute(self, input_data: Dict[str, Any], scopes: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Execute AI step; caching as in AIRunner.execute"""
+        try:
+            step_type = input_data.get("type", "openai")
+            prompt = input_data.get("prompt", "")
+            model = input_data.get("model", "gpt-3.5-turbo")
+            max_tokens = input_data.get("max_tokens", 1000)
+            temperature = input_data.get("temperature", 0.7)
+            
+            if step_type == "openai":
+                execute = self._execute_openai
+            elif step_type == "anthropic":
+                execute = self._execute_anthropic
+            else:
+                return {
+                    "success": False,
+                    "error": f"Unknown AI provider: {step_type}"
+                }
+            
+            cache = ai_cache.cache_key(
+                input_data.get("cache"), step_type, model, prompt, temperature, max_tokens, scopes or {}
+            )
+            # The cache's Redis client is synchronous
+            if cache is not None:
+                cached = await asyncio.to_thread(ai_cache.lookup, cache[0], step_type)
+                if cached is not None:
+                    return cached
+            result = await execute(prompt, model, max_tokens, temperature)
+            if cache is not None and result.get("success", False):
+                await asyncio.to_thread(ai_cache.store, *cache, result)
+            return result
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def _execute_openai(self, prompt: str, model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        try:
+            with observe_provider("openai"):
+                response = await self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+            
+            return openai_result(response, model)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"OpenAI error: {str(e)}"
+            }
+    
+    async def _execute_anthropic(self, prompt: str, model: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        try:
+            with observe_provider("anthropic"):
+                response = await self.anthropic_client.messages.create(
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            
+            return anthropic_result(response, model)
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Anthropic error: {str(e)}"
+            }
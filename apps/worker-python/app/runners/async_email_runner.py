@@ -0,0 +1,33 @@
+import asyncio
+from typing import Dict, Any
+
+from .email_runner import EmailRunner, build_message, sent_result
+
+class AsyncEmailRunner(EmailRunner):
+    """EmailRunner for the asyncio engine.
+
+    Sends go through the process's SMTP pool on a thread, so both engines
+    share its connections and its rate limit.
+    """
+
+    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute email step"""
+        try:
+            to_emails = input_data.get("to", [])
+            if not to_emails:
+                return {
+                    "success": False,
+                    "error": "No recipient emails provided"
+                }
+            
+            msg, all_recipients = build_message(input_data, self.from_email)
+            
+            await asyncio.to_thread(self.smtp.send, msg, all_recipients)
+            
+            return sent_result(input_data)
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Email sending failed: {str(e)}"
+            }
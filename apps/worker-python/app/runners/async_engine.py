@@ -0,0 +1,53 @@
+"""Per-process event loop for the asyncio runner engine.
+
+Celery tasks are synchronous, so each worker process keeps one loop running
+on a daemon thread and tasks hand their coroutines to it. Provider calls from
+every task in the process then share that loop and its connection pools
+instead of each holding a thread for the length of a network round trip.
+The loop is recreated when the pid changes, since a loop thread does not
+survive the prefork fork.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Coroutine, Dict
+
+_lock = threading.Lock()
+_loop = None
+_pid = None
+_runners: Dict[str, Any] = {}
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _pid
+    with _lock:
+        if _loop is None or _pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _pid = os.getpid()
+            _runners.clear()
+            threading.Thread(target=_loop.run_forever, name="async-runner-loop", daemon=True).start()
+        return _loop
+
+
+def run(coro: Coroutine) -> Any:
+    """Run ``coro`` on the process loop, blocking the calling thread until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+
+def shared_runners() -> Dict[str, Any]:
+    """The async provider runners for this process, created on first use.
+
+    Call from the loop thread only; their clients are bound to that loop.
+    """
+    if not _runners:
+        from .async_ai_runner import AsyncAIRunner
+        from .async_connector_runner import AsyncConnectorRunner
+        from .async_email_runner import AsyncEmailRunner
+
+        _runners.update(
+            ai=AsyncAIRunner(),
+            email=AsyncEmailRunner(),
+            connector=AsyncConnectorRunner(),
+        )
+    return _runners
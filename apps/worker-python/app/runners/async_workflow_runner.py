@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Dict, Any, Optional
+from . import async_engine, scheduler
+from .step_records import step_recorder
+from .workflow_runner import STEP_TYPES
+from ..metrics import STEP_DURATION
+
+class AsyncWorkflowRunner:
+    """WorkflowRunner with steps as coroutines on the process event loop.
+
+    Scheduling, results and run_steps records match WorkflowRunner; the
+    difference is that a step waiting on a provider costs no thread, so
+    parallel steps, foreach iterations and concurrent runs in one worker
+    process overlap their network time (see async_engine).
+    """
+
+    def __init__(self, db, run_id: str, workflow_id: Optional[str] = None):
+        self.db = db
+        self.run_id = run_id
+        # Ids that AI steps can scope their response cache to
+        self.scopes = {"run": run_id, "workflow": workflow_id}
+        self.records = step_recorder(db, run_id)
+    
+    def execute(self, workflow_definition: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a workflow definition, blocking until it finishes"""
+        return async_engine.run(self.run(workflow_definition))
+    
+    async def run(self, workflow_definition: Dict[str, Any]) -> Dict[str, Any]:
+        # The session is synchronous: writes go to a thread, one at a time
+        self._records_lock = asyncio.Lock()
+        self.runners = async_engine.shared_runners()
+        try:
+            return await self._execute_steps(workflow_definition)
+        finally:
+            await self._record(self.records.flush)
+    
+    async def _execute_steps(self, workflow_definition: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._drive(scheduler.workflow(workflow_definition, self.records, self._execute_step))
+    
+    async def _drive(self, schedule) -> Dict[str, Any]:
+        """Carry out a schedule, running what it starts as tasks"""
+        return await scheduler.drive_async(
+            schedule, lambda child, limit: asyncio.create_task(self._drive(child)), self._first_completed, self._record
+        )
+    
+    @staticmethod
+    async def _first_completed(running):
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        return done
+    
+    async def _record(self, write, *args):
+        async with self._records_lock:
+            return await asyncio.to_thread(write, *args)
+    
+    async def _execute_step(self, step_type: str, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = await self._dispatch_step(step_type, config, context)
+        STEP_DURATION.labels(
+            step_type if step_type in STEP_TYPES else "UNKNOWN", "COMPLETED" if result.get("success", False) else "FAILED"
+        ).observe(time.perf_counter() - started)
+        return result
+    
+    async def _dispatch_step(self, step_type: str, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            if step_type == "AI":
+                return await self.runners["ai"].execute(config, self.scopes)
+            elif step_type == "EMAIL":
+                return await self.runners["email"].execute(config)
+            elif step_type == "CONNECTOR":
+                return await self.runners["connector"].execute(config)
+            elif step_type == "LOOP":
+                return await self._drive(scheduler.loop(config, context, self._execute_step))
+            else:
+                return {
+                    "success": False,
+                    "error": f"Unknown step type: {step_type}"
+                }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
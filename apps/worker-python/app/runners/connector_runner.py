@@ -1,15 +1,38 @@
-import requests
 import json
 from typing import Dict, Any
 import os
 from dotenv import load_dotenv
 
+from ..clients import CONNECTOR_TIMEOUT, get_clients
+from ..metrics import observe_provider
+
 load_dotenv()
 
+WEBHOOK_METHODS = ("POST", "GET", "PUT", "DELETE")
+
+def linkedin_post(config: Dict[str, Any]) -> Dict[str, Any]:
+    """UGC post body for the LinkedIn "post" action"""
+    return {
+        "author": f"urn:li:person:{config.get('person_id', '')}",
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {
+            "com.linkedin.ugc.ShareContent": {
+                "shareCommentary": {
+                    "text": config.get("text", "")
+                },
+                "shareMediaCategory": "NONE"
+            }
+        },
+        "visibility": {
+            "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
+        }
+    }
+
 class ConnectorRunner:
     def __init__(self):
         self.linkedin_token = os.getenv("LINKEDIN_ACCESS_TOKEN")
         self.linkedin_base_url = "https://api.linkedin.com/v2"
+        self.http = get_clients().http
     
     def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute connector step"""
@@ -50,27 +73,15 @@ class ConnectorRunner:
             
             if action == "post":
                 # Create a LinkedIn post
-                post_data = {
-                    "author": f"urn:li:person:{config.get('person_id', '')}",
-                    "lifecycleState": "PUBLISHED",
-                    "specificContent": {
-                        "com.linkedin.ugc.ShareContent": {
-                            "shareCommentary": {
-                                "text": config.get("text", "")
-                            },
-                            "shareMediaCategory": "NONE"
-                        }
-                    },
-                    "visibility": {
-                        "com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"
-                    }
-                }
+                post_data = linkedin_post(config)
                 
-                response = requests.post(
-                    f"{self.linkedin_base_url}/ugcPosts",
-                    headers=headers,
-                    json=post_data
-                )
+                with observe_provider("linkedin"):
+                    response = self.http.post(
+                        f"{self.linkedin_base_url}/ugcPosts",
+                        headers=headers,
+                        json=post_data,
+                        timeout=CONNECTOR_TIMEOUT
+                    )
                 
                 if response.status_code == 201:
                     return {
@@ -86,10 +97,12 @@ class ConnectorRunner:
             
             elif action == "get_profile":
                 # Get LinkedIn profile
-                response = requests.get(
-                    f"{self.linkedin_base_url}/people/~",
-                    headers=headers
-                )
+                with observe_provider("linkedin"):
+                    response = self.http.get(
+                        f"{self.linkedin_base_url}/people/~",
+                        headers=headers,
+                        timeout=CONNECTOR_TIMEOUT
+                    )
                 
                 if response.status_code == 200:
                     return {
@@ -128,20 +141,22 @@ class ConnectorRunner:
                     "error": "Webhook URL not provided"
                 }
             
-            if method == "POST":
-                response = requests.post(url, json=data, headers=headers)
-            elif method == "GET":
-                response = requests.get(url, headers=headers)
-            elif method == "PUT":
-                response = requests.put(url, json=data, headers=headers)
-            elif method == "DELETE":
-                response = requests.delete(url, headers=headers)
-            else:
+            if method not in WEBHOOK_METHODS:
                 return {
                     "success": False,
                     "error": f"Unsupported HTTP method: {method}"
                 }
             
+            with observe_provider("webhook"):
+                if method == "POST":
+                    response = self.http.post(url, json=data, headers=headers, timeout=CONNECTOR_TIMEOUT)
+                elif method == "GET":
+                    response = self.http.get(url, headers=headers, timeout=CONNECTOR_TIMEOUT)
+                elif method == "PUT":
+                    response = self.http.put(url, json=data, headers=headers, timeout=CONNECTOR_TIMEOUT)
+                else:
+                    response = self.http.delete(url, headers=headers, timeout=CONNECTOR_TIMEOUT)
+            
             return {
                 "success": response.status_code < 400,
                 "status_code": response.status_code,
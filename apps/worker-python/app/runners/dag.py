@@ -0,0 +1,61 @@
+import json
+import re
+from typing import Any, Dict, List, Set
+
+# "{{s2a.output}}", "{{ s2.* }}", "{{s1.rows}}": the name before the first dot
+STEP_REFERENCE = re.compile(r"\{\{\s*([A-Za-z_][\w-]*)\.")
+
+
+def step_ids(steps: List[Dict[str, Any]]) -> List[str]:
+    return [step.get("id", f"step_{i}") for i, step in enumerate(steps)]
+
+
+def referenced_steps(config: Any) -> Set[str]:
+    """Names referenced through ``{{name.…}}`` placeholders anywhere in ``config``,
+    plus the source of a foreach loop's ``items`` path ("s1.rows" -> "s1")"""
+    names = set(STEP_REFERENCE.findall(json.dumps(config)))
+    items = config.get("items") if isinstance(config, dict) else None
+    if isinstance(items, str):
+        names.add(items.split(".", 1)[0])
+    return names
+
+
+def dependencies(steps: List[Dict[str, Any]], parallel: bool) -> Dict[str, Set[str]]:
+    """Map each step id to the ids it must wait for.
+
+    In parallel mode a step waits for its ``depends_on`` list plus every
+    step its config references; otherwise each step waits for the one
+    before it, which is the original strictly sequential order. Raises
+    ValueError on duplicate ids, unknown ``depends_on`` entries or cycles.
+    """
+    ids = step_ids(steps)
+    if len(set(ids)) != len(ids):
+        raise ValueError("Step ids must be unique")
+    if not parallel:
+        return {step_id: ({ids[i - 1]} if i else set()) for i, step_id in enumerate(ids)}
+
+    known = set(ids)
+    graph: Dict[str, Set[str]] = {}
+    for step_id, step in zip(ids, steps):
+        explicit = set(step.get("depends_on", []))
+        unknown = explicit - known
+        if unknown:
+            raise ValueError(f"Step {step_id} depends on unknown steps: {', '.join(sorted(unknown))}")
+        # References to names that are not steps (e.g. loop items) are ignored
+        inferred = referenced_steps(step.get("config", {})) & known
+        graph[step_id] = (explicit | inferred) - {step_id}
+
+    _check_acyclic(graph)
+    return graph
+
+
+def _check_acyclic(graph: Dict[str, Set[str]]):
+    remaining = {step_id: set(deps) for step_id, deps in graph.items()}
+    while remaining:
+        ready = [step_id for step_id, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Step dependencies form a cycle: {', '.join(sorted(remaining))}")
+        for step_id in ready:
+            del remaining[step_id]
+        for deps in remaining.values():
+            deps.difference_update(ready)
@@ -0,0 +1,347 @@
+"""Step scheduling shared by WorkflowRunner and AsyncWorkflowRunner.
+
+The DAG scheduler and the for/foreach loops are written once, as
+generators that decide what happens next but do no work themselves. They
+yield actions and are sent back each action's result:
+
+- ("start", schedule, limit): start driving another schedule concurrently,
+  with at most ``limit`` started by this schedule running at once; the
+  result is a handle with a ``result()`` method (a Future or a Task)
+- ("wait", handles): the handles that have finished, once at least one has
+- ("run", execute_step, step_type, config, context): a step's result
+- ("write", fn, *args): ``fn(*args)`` on the session, e.g. a run_steps write
+
+``drive`` and ``drive_async`` carry the actions out; a runner only supplies
+how to start a schedule and how to wait for the first completed one (and,
+when async, how to make a session write). An exception raised by an action
+is thrown back into the schedule.
+"""
+
+import os
+from typing import Any, Callable, Dict, Generator, List
+
+from . import dag
+
+# Default cap on concurrently running steps; a definition may set its own
+WORKFLOW_MAX_PARALLEL_STEPS = int(os.getenv("WORKFLOW_MAX_PARALLEL_STEPS", "4"))
+# Upper bound on a foreach loop's max_concurrency setting
+LOOP_MAX_CONCURRENCY = int(os.getenv("LOOP_MAX_CONCURRENCY", "16"))
+
+Schedule = Generator[tuple, Any, Dict[str, Any]]
+
+
+def drive(schedule: Schedule, start: Callable, wait_first: Callable) -> Dict[str, Any]:
+    """Carry out a schedule's actions on the calling thread"""
+    resume, value = schedule.send, None
+    while True:
+        try:
+            kind, *args = resume(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            if kind == "start":
+                value = start(*args)
+            elif kind == "wait":
+                value = wait_first(*args)
+            else:
+                value = args[0](*args[1:])
+            resume = schedule.send
+        except Exception as e:
+            resume, value = schedule.throw, e
+
+
+async def drive_async(schedule: Schedule, start: Callable, wait_first: Callable, write: Callable) -> Dict[str, Any]:
+    """Carry out a schedule's actions on the event loop; ``wait_first`` and ``write`` are coroutines"""
+    resume, value = schedule.send, None
+    while True:
+        try:
+            kind, *args = resume(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            if kind == "start":
+                value = start(*args)
+            elif kind == "wait":
+                value = await wait_first(*args)
+            elif kind == "run":
+                value = await args[0](*args[1:])
+            else:
+                value = await write(*args)
+            resume = schedule.send
+        except Exception as e:
+            resume, value = schedule.throw, e
+
+
+def workflow(workflow_definition: Dict[str, Any], records, execute_step: Callable) -> Schedule:
+    """Run the definition's steps.
+
+    Steps run as soon as the steps they depend on have completed, up to
+    max_parallel_steps at a time (see dag.dependencies). run_steps writes
+    are made by this schedule alone, so they stay serialized. The first
+    failure stops new steps from starting; steps already running are
+    allowed to finish.
+    """
+    try:
+        steps = workflow_definition.get("steps", [])
+        if not steps:
+            return {
+                "success": False,
+                "error": "No steps defined in workflow"
+            }
+
+        parallel = bool(workflow_definition.get("parallel")) or any("depends_on" in step for step in steps)
+        try:
+            graph = dag.dependencies(steps, parallel)
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        ids = dag.step_ids(steps)
+        max_parallel = max(1, int(workflow_definition.get("max_parallel_steps", WORKFLOW_MAX_PARALLEL_STEPS)))
+
+        results: List[Any] = [None] * len(steps)
+        context = {}
+        completed = set()
+        waiting = list(range(len(steps)))
+        running = {}
+        failed = None
+
+        # Resume after an earlier attempt: its completed steps are not run again
+        for i, output in (yield ("write", checkpoint, records, steps, ids)).items():
+            results[i] = output
+            context[f"step_{i}"] = output
+            context[ids[i]] = output
+            completed.add(ids[i])
+            waiting.remove(i)
+
+        while waiting or running:
+            if failed is None:
+                for i in [i for i in waiting if graph[ids[i]] <= completed]:
+                    if len(running) >= max_parallel:
+                        break
+                    waiting.remove(i)
+                    step_type = steps[i].get("type", "")
+                    step_config = steps[i].get("config", {})
+
+                    # Create step record
+                    step_run_id = yield ("write", records.create, ids[i], step_type, step_config)
+
+                    # Execute step; it sees the outputs of everything completed so far
+                    handle = yield ("start", _step(execute_step, step_type, step_config, dict(context)), max_parallel)
+                    running[handle] = (i, step_run_id)
+            if not running:
+                break
+
+            for handle in (yield ("wait", running)):
+                i, step_run_id = running.pop(handle)
+                result = handle.result()
+                results[i] = result
+
+                # Update step record with result
+                yield ("write", records.update, step_run_id, result)
+
+                # Update context with step result
+                if result.get("success", False):
+                    context[f"step_{i}"] = result
+                    context[ids[i]] = result
+                    completed.add(ids[i])
+                elif failed is None:
+                    failed = i
+
+        if failed is not None:
+            return {
+                "success": False,
+                "error": f"Step {ids[failed]} failed: {results[failed].get('error', 'Unknown error')}",
+                "results": [result for result in results if result is not None]
+            }
+
+        return {
+            "success": True,
+            "results": results,
+            "context": context
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+def loop(config: Dict[str, Any], context: Dict[str, Any], execute_step: Callable) -> Schedule:
+    """Execute a loop step"""
+    try:
+        loop_type = config.get("type", "for")
+        iterations = config.get("iterations", 1)
+        steps = config.get("steps", [])
+
+        if loop_type == "for":
+            results = []
+            for i in range(iterations):
+                iteration_results = []
+                for step in steps:
+                    step_result = yield ("run", execute_step, step.get("type", ""), step.get("config", {}), context)
+                    iteration_results.append(step_result)
+
+                    if not step_result.get("success", False):
+                        return {
+                            "success": False,
+                            "error": f"Loop iteration {i} failed at step {step.get('id', 'unknown')}",
+                            "results": results
+                        }
+
+                results.append(iteration_results)
+
+            return {
+                "success": True,
+                "results": results,
+                "iterations": iterations
+            }
+
+        elif loop_type == "foreach":
+            return (yield from foreach(config, context, execute_step))
+
+        else:
+            return {
+                "success": False,
+                "error": f"Unknown loop type: {loop_type}"
+            }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+def foreach(config: Dict[str, Any], context: Dict[str, Any], execute_step: Callable) -> Schedule:
+    """Run ``steps`` once per element of ``items``, up to max_concurrency at a time.
+
+    ``items`` is a list or a dotted context path such as "s1.rows". Each
+    iteration sees the element as ``item`` (or ``item_var``) and its
+    position as ``index``. ``ordered`` keeps results in item order rather
+    than completion order; ``on_error`` is "stop" (no new iterations after
+    a failure) or "collect" (run everything, report failures in ``errors``).
+    """
+    try:
+        settings = foreach_settings(config, context)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+    items, ordered, on_error = settings["items"], settings["ordered"], settings["on_error"]
+    collect_results, max_concurrency = settings["collect_results"], settings["max_concurrency"]
+
+    results: List[Any] = [None] * len(items) if ordered and collect_results else []
+    errors = []
+    upcoming = iter(enumerate(items))
+    running = {}
+    stopped = False
+    while True:
+        while not stopped and len(running) < max_concurrency:
+            next_item = next(upcoming, None)
+            if next_item is None:
+                break
+            handle = yield ("start", _iteration(settings, context, execute_step, *next_item), max_concurrency)
+            running[handle] = next_item[0]
+        if not running:
+            break
+        for handle in (yield ("wait", running)):
+            index = running.pop(handle)
+            outcome = handle.result()
+            if not outcome["success"]:
+                errors.append({"index": index, "error": outcome["error"]})
+                stopped = stopped or on_error == "stop"
+            if not collect_results:
+                continue
+            if ordered:
+                results[index] = outcome["results"]
+            else:
+                results.append({"index": index, "results": outcome["results"]})
+
+    return foreach_result(settings, results, errors)
+
+
+def _step(execute_step: Callable, step_type: str, config: Dict[str, Any], context: Dict[str, Any]) -> Schedule:
+    return (yield ("run", execute_step, step_type, config, context))
+
+
+def _iteration(settings: Dict[str, Any], context: Dict[str, Any], execute_step: Callable,
+               index: int, item: Any) -> Schedule:
+    scope = {**context, settings["item_var"]: item, "index": index}
+    iteration_results = []
+    for step in settings["steps"]:
+        step_result = yield ("run", execute_step, step.get("type", ""), step.get("config", {}), scope)
+        iteration_results.append(step_result)
+        if not step_result.get("success", False):
+            return {
+                "success": False,
+                "error": f"Loop item {index} failed at step {step.get('id', 'unknown')}: {step_result.get('error', 'Unknown error')}",
+                "results": iteration_results
+            }
+        scope[step.get("id", "")] = step_result
+    return {"success": True, "results": iteration_results}
+
+
+def checkpoint(records, steps: List[Dict[str, Any]], ids: List[str]) -> Dict[int, Dict[str, Any]]:
+    """Outputs of the steps, by index, that an earlier attempt at the run completed.
+
+    A step only counts if its config is unchanged since then, so editing a
+    workflow between attempts re-runs the edited steps.
+    """
+    done = records.completed()
+    return {
+        i: done[step_id].output_data
+        for i, step_id in enumerate(ids)
+        if step_id in done and done[step_id].input_data == steps[i].get("config", {})
+    }
+
+
+def foreach_settings(config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated foreach options with ``items`` resolved; raises ValueError"""
+    items = config.get("items", [])
+    if isinstance(items, str):
+        items = resolve_path(context, items)
+    if not isinstance(items, list):
+        raise ValueError(f"Loop items must be a list, got {type(items).__name__}")
+    on_error = config.get("on_error", "stop")
+    if on_error not in ("stop", "collect"):
+        raise ValueError(f"Unknown loop on_error mode: {on_error}")
+    return {
+        "items": items,
+        "steps": config.get("steps", []),
+        "item_var": config.get("item_var", "item"),
+        "ordered": config.get("ordered", True),
+        "on_error": on_error,
+        "collect_results": config.get("collect_results", True),
+        "max_concurrency": min(max(1, int(config.get("max_concurrency", 1))), LOOP_MAX_CONCURRENCY),
+    }
+
+
+def foreach_result(settings: Dict[str, Any], results: List[Any], errors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if settings["ordered"] and settings["collect_results"]:
+        results = [result for result in results if result is not None]
+    summary = {
+        "results": results,
+        "items": len(settings["items"]),
+        "failed": len(errors),
+    }
+    if errors and settings["on_error"] == "stop":
+        first = min(errors, key=lambda error: error["index"])
+        return {"success": False, "error": first["error"], "errors": errors, **summary}
+    return {"success": True, "errors": errors, **summary}
+
+
+def resolve_path(context: Dict[str, Any], path: str) -> Any:
+    """Follow a dotted path such as "s1.rows" or "s2.results.0" through context"""
+    value: Any = context
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
@@ -0,0 +1,230 @@
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+from ..events import publish_run_event
+
+load_dotenv()
+
+# "step" commits every record write; "batched" coalesces writes and flushes
+# every STEP_RECORD_BATCH_SIZE records or STEP_RECORD_FLUSH_SECONDS; "run"
+# writes everything once, when the run finishes
+STEP_RECORD_DURABILITY = os.getenv("STEP_RECORD_DURABILITY", "step").lower()
+STEP_RECORD_BATCH_SIZE = int(os.getenv("STEP_RECORD_BATCH_SIZE", "100"))
+STEP_RECORD_FLUSH_SECONDS = float(os.getenv("STEP_RECORD_FLUSH_SECONDS", "1.0"))
+# Rows per INSERT statement when a flush is larger than this
+MAX_ROWS_PER_STATEMENT = 500
+
+
+class StepRecorder:
+    """Writes a run's run_steps rows and publishes their status events.
+
+    Not thread-safe: runners call it from one thread at a time.
+    """
+
+    def __init__(self, db, run_id: str):
+        self.db = db
+        self.run_id = run_id
+
+    def create(self, step_id: str, step_type: str, config: Dict[str, Any]) -> str:
+        """Create a step record in the database.
+
+        Runners create the record as they start the step, so it is stamped
+        started_at too; step durations in the stats rollups depend on it.
+        """
+        step_run_id = str(uuid.uuid4())
+        
+        self.db.execute(
+            text("""
+                INSERT INTO run_steps (id, run_id, step_id, step_type, input_data, status, started_at, created_at)
+                VALUES (:id, :run_id, :step_id, :step_type, CAST(:input_data AS JSONB), 'PENDING', NOW(), NOW())
+            """),
+            {
+                "id": step_run_id,
+                "run_id": self.run_id,
+                "step_id": step_id,
+                "step_type": step_type,
+                "input_data": json.dumps(config)
+            }
+        )
+        self.db.commit()
+        publish_run_event(self.run_id, {
+            "event": "step",
+            "id": step_run_id,
+            "step_id": step_id,
+            "step_type": step_type,
+            "status": "PENDING"
+        })
+        return step_run_id
+    
+    def update(self, step_run_id: str, result: Dict[str, Any]):
+        """Update step record with execution result"""
+        status = "COMPLETED" if result.get("success", False) else "FAILED"
+        error_message = result.get("error") if not result.get("success", False) else None
+        
+        self.db.execute(
+            text("""
+                UPDATE run_steps 
+                SET status = :status, 
+                    output_data = CAST(:output_data AS JSONB), 
+                    error_message = :error_message,
+                    completed_at = NOW()
+                WHERE id = :id
+            """),
+            {
+                "id": step_run_id,
+                "status": status,
+                "output_data": json.dumps(result),
+                "error_message": error_message
+            }
+        )
+        self.db.commit()
+        publish_run_event(self.run_id, {
+            "event": "step",
+            "id": step_run_id,
+            "status": status,
+            "error_message": error_message
+        })
+    
+    def completed(self) -> Dict[str, Any]:
+        """The latest COMPLETED row per step id left by earlier attempts at this run"""
+        rows = self.db.execute(
+            text("""
+                SELECT DISTINCT ON (step_id) step_id, input_data, output_data
+                FROM run_steps
+                WHERE run_id = :run_id AND status = 'COMPLETED'
+                ORDER BY step_id, completed_at DESC
+            """),
+            {"run_id": self.run_id}
+        )
+        return {row.step_id: row for row in rows}
+    
+    def flush(self):
+        """Write anything buffered; every write is already committed here"""
+
+
+class BufferedStepRecorder(StepRecorder):
+    """StepRecorder that coalesces writes into multi-row upserts.
+
+    A step's insert and its result usually land in the same batch as a
+    single row. Rows carry their own created_at so a later batch can upsert
+    a step that was first written PENDING (the primary key is id plus
+    created_at). Events are published after the batch that persists them.
+    Thresholds are checked on each write; runners call flush() when the run
+    ends. With ``batch_size=None`` nothing is written before then.
+    """
+
+    def __init__(self, db, run_id: str, batch_size=STEP_RECORD_BATCH_SIZE,
+                 flush_seconds: float = STEP_RECORD_FLUSH_SECONDS):
+        super().__init__(db, run_id)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.dirty: Dict[str, None] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.last_flush = time.monotonic()
+
+    def create(self, step_id: str, step_type: str, config: Dict[str, Any]) -> str:
+        step_run_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        self.rows[step_run_id] = {
+            "id": step_run_id,
+            "run_id": self.run_id,
+            "step_id": step_id,
+            "step_type": step_type,
+            "input_data": json.dumps(config),
+            "status": "PENDING",
+            "output_data": None,
+            "error_message": None,
+            "started_at": now,
+            "completed_at": None,
+            "created_at": now,
+        }
+        self.dirty[step_run_id] = None
+        self.events.append({
+            "event": "step",
+            "id": step_run_id,
+            "step_id": step_id,
+            "step_type": step_type,
+            "status": "PENDING"
+        })
+        self._maybe_flush()
+        return step_run_id
+
+    def update(self, step_run_id: str, result: Dict[str, Any]):
+        success = result.get("success", False)
+        row = self.rows[step_run_id]
+        row.update(
+            status="COMPLETED" if success else "FAILED",
+            output_data=json.dumps(result),
+            error_message=None if success else result.get("error"),
+            completed_at=datetime.now(timezone.utc),
+        )
+        self.dirty[step_run_id] = None
+        self.events.append({
+            "event": "step",
+            "id": step_run_id,
+            "status": row["status"],
+            "error_message": row["error_message"]
+        })
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.batch_size is None:
+            return
+        if len(self.dirty) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.dirty:
+            return
+        rows = [self.rows[step_run_id] for step_run_id in self.dirty]
+        for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+            self._upsert(rows[start:start + MAX_ROWS_PER_STATEMENT])
+        self.db.commit()
+        # Finished steps will not be written again
+        for row in rows:
+            if row["status"] != "PENDING":
+                del self.rows[row["id"]]
+        self.dirty.clear()
+        events, self.events = self.events, []
+        for event in events:
+            publish_run_event(self.run_id, event)
+
+    def _upsert(self, rows: List[Dict[str, Any]]):
+        values, params = [], {}
+        for n, row in enumerate(rows):
+            values.append(
+                f"(:id_{n}, :run_id_{n}, :step_id_{n}, :step_type_{n}, CAST(:input_data_{n} AS JSONB), "
+                f":status_{n}, CAST(:output_data_{n} AS JSONB), :error_message_{n}, :started_at_{n}, :completed_at_{n}, "
+                f":created_at_{n})"
+            )
+            params.update({f"{column}_{n}": value for column, value in row.items()})
+        self.db.execute(
+            text(f"""
+                INSERT INTO run_steps (id, run_id, step_id, step_type, input_data,
+                                       status, output_data, error_message, started_at, completed_at, created_at)
+                VALUES {", ".join(values)}
+                ON CONFLICT (id, created_at) DO UPDATE
+                SET status = EXCLUDED.status,
+                    output_data = EXCLUDED.output_data,
+                    error_message = EXCLUDED.error_message,
+                    completed_at = EXCLUDED.completed_at
+            """),
+            params
+        )
+
+
+def step_recorder(db, run_id: str, durability: str = STEP_RECORD_DURABILITY) -> StepRecorder:
+    if durability == "batched":
+        return BufferedStepRecorder(db, run_id)
+    if durability == "run":
+        return BufferedStepRecorder(db, run_id, batch_size=None)
+    return StepRecorder(db, run_id)
@@ -1,124 +1,79 @@
-import json
-from typing import Dict, Any, List
-from sqlalchemy import text
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, Optional
 from .ai_runner import AIRunner
 from .email_runner import EmailRunner
 from .connector_runner import ConnectorRunner
+from . import scheduler
+from .step_records import step_recorder
+from ..metrics import STEP_DURATION
+
+STEP_TYPES = {"AI", "EMAIL", "CONNECTOR", "LOOP"}
 
 class WorkflowRunner:
-    def __init__(self, db, run_id: str):
+    def __init__(self, db, run_id: str, workflow_id: Optional[str] = None):
         self.db = db
         self.run_id = run_id
+        # Ids that AI steps can scope their response cache to
+        self.scopes = {"run": run_id, "workflow": workflow_id}
+        self.records = step_recorder(db, run_id)
         self.ai_runner = AIRunner()
         self.email_runner = EmailRunner()
         self.connector_runner = ConnectorRunner()
     
     def execute(self, workflow_definition: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a workflow definition"""
+        """Execute a workflow definition, then write any buffered step records"""
         try:
-            steps = workflow_definition.get("steps", [])
-            if not steps:
-                return {
-                    "success": False,
-                    "error": "No steps defined in workflow"
-                }
-            
-            results = []
-            context = {}
-            
-            for i, step in enumerate(steps):
-                step_id = step.get("id", f"step_{i}")
-                step_type = step.get("type", "")
-                step_config = step.get("config", {})
-                
-                # Create step record
-                step_run_id = self._create_step_record(step_id, step_type, step_config)
-                
-                # Execute step
-                result = self._execute_step(step_type, step_config, context)
-                results.append(result)
-                
-                # Update step record with result
-                self._update_step_record(step_run_id, result)
-                
-                # Update context with step result
-                if result.get("success", False):
-                    context[f"step_{i}"] = result
-                else:
-                    # If step failed, stop execution
-                    return {
-                        "success": False,
-                        "error": f"Step {step_id} failed: {result.get('error', 'Unknown error')}",
-                        "results": results
-                    }
-            
-            return {
-                "success": True,
-                "results": results,
-                "context": context
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            return self._execute_steps(workflow_definition)
+        finally:
+            self.records.flush()
     
-    def _create_step_record(self, step_id: str, step_type: str, config: Dict[str, Any]) -> str:
-        """Create a step record in the database"""
-        import uuid
-        step_run_id = str(uuid.uuid4())
-        
-        self.db.execute(
-            text("""
-                INSERT INTO run_steps (id, run_id, step_id, step_type, input_data, status, created_at)
-                VALUES (:id, :run_id, :step_id, :step_type, :input_data, 'PENDING', NOW())
-            """),
-            {
-                "id": step_run_id,
-                "run_id": self.run_id,
-                "step_id": step_id,
-                "step_type": step_type,
-                "input_data": json.dumps(config)
-            }
-        )
-        self.db.commit()
-        return step_run_id
+    def _execute_steps(self, workflow_definition: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the definition's steps on pool threads (see scheduler.workflow).
+
+        The session is only used from this thread, so run_steps writes stay
+        serialized.
+        """
+        return self._drive(scheduler.workflow(workflow_definition, self.records, self._execute_step))
     
-    def _update_step_record(self, step_run_id: str, result: Dict[str, Any]):
-        """Update step record with execution result"""
-        status = "COMPLETED" if result.get("success", False) else "FAILED"
-        error_message = result.get("error") if not result.get("success", False) else None
+    def _drive(self, schedule) -> Dict[str, Any]:
+        """Carry out a schedule, running what it starts on a pool sized to its limit"""
+        pools = []
         
-        self.db.execute(
-            text("""
-                UPDATE run_steps 
-                SET status = :status, 
-                    output_data = :output_data, 
-                    error_message = :error_message,
-                    completed_at = NOW()
-                WHERE id = :id
-            """),
-            {
-                "id": step_run_id,
-                "status": status,
-                "output_data": json.dumps(result),
-                "error_message": error_message
-            }
-        )
-        self.db.commit()
+        def start(child, limit: int):
+            if not pools:
+                pools.append(ThreadPoolExecutor(max_workers=limit))
+            return pools[0].submit(self._drive, child)
+        
+        def wait_first(running):
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            return done
+        
+        try:
+            return scheduler.drive(schedule, start, wait_first)
+        finally:
+            for pool in pools:
+                pool.shutdown()
     
     def _execute_step(self, step_type: str, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single step"""
+        started = time.perf_counter()
+        result = self._dispatch_step(step_type, config, context)
+        STEP_DURATION.labels(
+            step_type if step_type in STEP_TYPES else "UNKNOWN", "COMPLETED" if result.get("success", False) else "FAILED"
+        ).observe(time.perf_counter() - started)
+        return result
+    
+    def _dispatch_step(self, step_type: str, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         try:
             if step_type == "AI":
-                return self.ai_runner.execute(config)
+                return self.ai_runner.execute(config, self.scopes)
             elif step_type == "EMAIL":
                 return self.email_runner.execute(config)
             elif step_type == "CONNECTOR":
                 return self.connector_runner.execute(config)
             elif step_type == "LOOP":
-                return self._execute_loop(config, context)
+                return self._drive(scheduler.loop(config, context, self._execute_step))
             else:
                 return {
                     "success": False,
@@ -129,45 +84,3 @@ class WorkflowRunner:
                 "success": False,
                 "error": str(e)
             }
-    
-    def _execute_loop(self, config: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a loop step"""
-        try:
-            loop_type = config.get("type", "for")
-            iterations = config.get("iterations", 1)
-            steps = config.get("steps", [])
-            
-            if loop_type == "for":
-                results = []
-                for i in range(iterations):
-                    iteration_results = []
-                    for step in steps:
-                        step_result = self._execute_step(step.get("type", ""), step.get("config", {}), context)
-                        iteration_results.append(step_result)
-                        
-                        if not step_result.get("success", False):
-                            return {
-                                "success": False,
-                                "error": f"Loop iteration {i} failed at step {step.get('id', 'unknown')}",
-                                "results": results
-                            }
-                    
-                    results.append(iteration_results)
-                
-                return {
-                    "success": True,
-                    "results": results,
-                    "iterations": iterations
-                }
-            
-            else:
-                return {
-                    "success": False,
-                    "error": f"Unknown loop type: {loop_type}"
-                }
-                
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
@@ -0,0 +1,138 @@
+"""Pooled SMTP transport for email steps.
+
+Each worker process keeps up to SMTP_POOL_SIZE authenticated connections
+and sends many messages over each one, instead of paying for connect,
+STARTTLS and LOGIN per email. Connections are dropped after an error,
+after SMTP_IDLE_TIMEOUT seconds unused or after
+SMTP_MAX_MESSAGES_PER_CONNECTION messages. SMTP_RATE_LIMIT caps the
+messages per second the process sends, which keeps it under provider
+connection and sending limits.
+"""
+
+import os
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import List
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+# Messages per second for the whole process; 0 disables throttling
+SMTP_RATE_LIMIT = float(os.getenv("SMTP_RATE_LIMIT", "0"))
+
+
+class PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+
+class SmtpPool:
+    def __init__(self, host: str = SMTP_SERVER, port: int = SMTP_PORT, username=SMTP_USERNAME,
+                 password=SMTP_PASSWORD, starttls: bool = SMTP_STARTTLS, size: int = SMTP_POOL_SIZE,
+                 idle_timeout: float = SMTP_IDLE_TIMEOUT,
+                 max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION, rate: float = SMTP_RATE_LIMIT):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.rate = rate
+        self.slots = threading.BoundedSemaphore(size)
+        self.idle: List[PooledConnection] = []
+        self.lock = threading.Lock()
+        self.next_send = 0.0
+
+    def send(self, msg: Message, recipients: List[str]):
+        """Send ``msg`` on a pooled connection, waiting for a free one and for the rate limit.
+
+        A reused connection that turns out to have been closed by the server
+        is replaced once; any other failure is raised after the connection
+        is discarded.
+        """
+        with self.slots:
+            self._pace()
+            connection = self._checkout()
+            try:
+                try:
+                    connection.smtp.send_message(msg, to_addrs=recipients)
+                except smtplib.SMTPServerDisconnected:
+                    if not connection.sent:
+                        raise
+                    connection.close()
+                    connection = self._connect()
+                    connection.smtp.send_message(msg, to_addrs=recipients)
+            except BaseException:
+                connection.close()
+                raise
+            connection.sent += 1
+            connection.last_used = time.monotonic()
+            if connection.sent >= self.max_messages:
+                connection.close()
+            else:
+                with self.lock:
+                    self.idle.append(connection)
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+    def _pace(self):
+        if self.rate <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            send_at = max(now, self.next_send)
+            self.next_send = send_at + 1 / self.rate
+        if send_at > now:
+            time.sleep(send_at - now)
+
+    def _checkout(self) -> PooledConnection:
+        expired = []
+        connection = None
+        with self.lock:
+            # Most recently used first; anything idle too long is dropped
+            while self.idle:
+                candidate = self.idle.pop()
+                if time.monotonic() - candidate.last_used < self.idle_timeout:
+                    connection = candidate
+                    break
+                expired.append(candidate)
+        for stale in expired:
+            stale.close()
+        return connection or self._connect()
+
+    def _connect(self) -> PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        return PooledConnection(smtp)
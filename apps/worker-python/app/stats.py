@@ -0,0 +1,141 @@
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+
+load_dotenv()
+
+# Width of a rollup bucket: "minute" or "hour". Changing it is safe; the
+# stats endpoint sums whatever buckets fall inside the requested window.
+STATS_GRANULARITY = os.getenv("STATS_GRANULARITY", "hour")
+
+# Upper bounds of the duration histogram buckets in milliseconds (1-2-5
+# steps up to an hour). Percentiles are reported as a bucket's upper bound.
+DURATION_BOUNDS_MS = [
+    10, 20, 50, 100, 200, 500,
+    1_000, 2_000, 5_000, 10_000, 20_000, 50_000,
+    100_000, 200_000, 500_000, 1_000_000, 2_000_000, 3_600_000,
+    2**31 - 1,
+]
+
+RUN_SUBJECT = "run"
+
+
+def bucket_start(at: datetime) -> datetime:
+    if STATS_GRANULARITY == "minute":
+        return at.replace(second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def duration_bucket(duration_ms: int) -> int:
+    return next((bound for bound in DURATION_BOUNDS_MS if duration_ms <= bound), DURATION_BOUNDS_MS[-1])
+
+
+def _duration_ms(started_at: Optional[datetime], completed_at: Optional[datetime]) -> Optional[int]:
+    if started_at is None or completed_at is None:
+        return None
+    return max(0, int((completed_at - started_at).total_seconds() * 1000))
+
+
+def _naive_utc(at: Optional[datetime]) -> Optional[datetime]:
+    if at is None or at.tzinfo is None:
+        return at
+    return at.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def record_run_outcome(
+    db,
+    run_id: str,
+    workflow_id: str,
+    status: str,
+    started_at: Optional[datetime],
+    completed_at: datetime,
+):
+    """Fold a finished run and its steps that finished since it was last counted into the rollups.
+
+    Runs in the caller's transaction, which holds the run's row lock, so the
+    rollups commit together with the run's terminal status. The outcome
+    counted for the run is kept in its runs.counted_* columns; a run that
+    finishes again after a resume or retry has that sample taken back out,
+    so each run is counted once, with its latest outcome, and each step row
+    once.
+    """
+    started_at, completed_at = _naive_utc(started_at), _naive_utc(completed_at)
+    counted = db.execute(
+        text("SELECT counted_status, counted_started_at, counted_completed_at FROM runs WHERE id = :run_id"),
+        {"run_id": run_id},
+    ).fetchone()
+    counted_at = _naive_utc(counted.counted_completed_at) if counted else None
+    bucket = bucket_start(completed_at)
+    # (bucket, subject, status, duration, +1 to add or -1 to take back out)
+    samples: List[Tuple[datetime, str, str, Optional[int], int]] = [
+        (bucket, RUN_SUBJECT, status, _duration_ms(started_at, completed_at), 1)
+    ]
+    if counted_at is not None:
+        samples.append((
+            bucket_start(counted_at), RUN_SUBJECT, counted.counted_status,
+            _duration_ms(_naive_utc(counted.counted_started_at), counted_at), -1,
+        ))
+    steps = db.execute(
+        text(f"""
+            SELECT step_type, status, COALESCE(started_at, created_at) AS started_at, completed_at FROM run_steps
+            WHERE run_id = :run_id AND status IN ('COMPLETED', 'FAILED')
+            {"" if counted_at is None else "AND completed_at > :counted_at"}
+        """),
+        {"run_id": run_id, "counted_at": counted_at},
+    )
+    for step in steps:
+        samples.append((bucket, step.step_type, step.status, _duration_ms(step.started_at, step.completed_at), 1))
+
+    counts: Dict[Tuple[datetime, str, str], List[int]] = defaultdict(lambda: [0, 0])
+    histogram: Dict[Tuple[datetime, str, int], int] = defaultdict(int)
+    for sample_bucket, subject, sample_status, duration_ms, weight in samples:
+        counts[(sample_bucket, subject, sample_status)][0] += weight
+        if duration_ms is not None:
+            counts[(sample_bucket, subject, sample_status)][1] += weight * duration_ms
+            histogram[(sample_bucket, subject, duration_bucket(duration_ms))] += weight
+
+    counts = {key: value for key, value in counts.items() if value != [0, 0]}
+    histogram = {key: count for key, count in histogram.items() if count}
+
+    # Upserts go in key order so concurrent runs lock shared rows consistently
+    if counts:
+        db.execute(
+            text("""
+                INSERT INTO run_stats_rollups (workflow_id, bucket_start, subject, status, count, duration_ms_sum)
+                VALUES (:workflow_id, :bucket_start, :subject, :status, :count, :duration_ms_sum)
+                ON CONFLICT (workflow_id, bucket_start, subject, status) DO UPDATE
+                SET count = run_stats_rollups.count + EXCLUDED.count,
+                    duration_ms_sum = run_stats_rollups.duration_ms_sum + EXCLUDED.duration_ms_sum
+            """),
+            [
+                {"workflow_id": workflow_id, "bucket_start": sample_bucket, "subject": subject,
+                 "status": sample_status, "count": count, "duration_ms_sum": duration_sum}
+                for (sample_bucket, subject, sample_status), (count, duration_sum) in sorted(counts.items())
+            ],
+        )
+    if histogram:
+        db.execute(
+            text("""
+                INSERT INTO run_duration_histograms (workflow_id, bucket_start, subject, le_ms, count)
+                VALUES (:workflow_id, :bucket_start, :subject, :le_ms, :count)
+                ON CONFLICT (workflow_id, bucket_start, subject, le_ms) DO UPDATE
+                SET count = run_duration_histograms.count + EXCLUDED.count
+            """),
+            [
+                {"workflow_id": workflow_id, "bucket_start": sample_bucket, "subject": subject,
+                 "le_ms": le_ms, "count": count}
+                for (sample_bucket, subject, le_ms), count in sorted(histogram.items())
+            ],
+        )
+    db.execute(
+        text("""
+            UPDATE runs
+            SET counted_status = :status, counted_started_at = :started_at, counted_completed_at = :completed_at
+            WHERE id = :run_id
+        """),
+        {"run_id": run_id, "status": status, "started_at": started_at, "completed_at": completed_at},
+    )
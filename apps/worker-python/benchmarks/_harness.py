@@ -0,0 +1,11 @@
+"""Shared helpers for the worker benchmarks; run them from ``apps/worker-python``"""
+
+
+def print_table(rows):
+    columns = list(rows[0].keys())
+    cells = [[f"{row[c]:.2f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(line[i]) for line in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
+
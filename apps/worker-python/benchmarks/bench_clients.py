@@ -0,0 +1,141 @@
+"""Per-step connection overhead with and without the shared client registry.
+
+Starts a local HTTPS stub (self-signed certificate made with ``openssl``)
+that answers OpenAI chat completions and webhooks, then runs ``--steps``
+steps of each kind:
+
+- fresh: a new client per step, as runners did before app/clients.py
+  (``requests.post`` for webhooks, a new ``openai.OpenAI`` for AI steps)
+- pooled: ConnectorRunner/AIRunner on the process's shared clients
+
+and reports ms per step and TLS connections opened per step. Run from
+``apps/worker-python``::
+
+    python -m benchmarks.bench_clients --steps 200
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import ssl
+import subprocess
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ._harness import print_table
+from .bench_engines import COMPLETION
+
+
+def make_certificate(directory: str):
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=127.0.0.1",
+         "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def serve(port: int, cert: str, key: str, connections):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            with connections.get_lock():
+                connections.value += 1
+            super().setup()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            body = json.dumps(COMPLETION).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    server.serve_forever()
+
+
+def fresh_step(kind: str, base_url: str):
+    if kind == "webhook":
+        import requests
+
+        response = requests.post(f"{base_url}/hook", json={"n": 1}, timeout=30)
+        return response.status_code < 400
+    import openai
+
+    client = openai.OpenAI(base_url=f"{base_url}/v1")
+    client.chat.completions.create(model="bench", messages=[{"role": "user", "content": "hi"}])
+    return True
+
+
+def pooled_step(kind: str, base_url: str):
+    if kind == "webhook":
+        from app.runners.connector_runner import ConnectorRunner
+
+        result = ConnectorRunner().execute({"type": "webhook", "config": {"url": f"{base_url}/hook", "data": {"n": 1}}})
+    else:
+        from app.runners.ai_runner import AIRunner
+
+        result = AIRunner().execute({"type": "openai", "prompt": "hi", "model": "bench"})
+    if not result.get("success"):
+        raise RuntimeError(result.get("error"))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--kinds", default="webhook,ai")
+    args = parser.parse_args()
+
+    base_url = f"https://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        # requests and httpx both trust the stub through these
+        os.environ.update(
+            REQUESTS_CA_BUNDLE=cert, SSL_CERT_FILE=cert,
+            OPENAI_BASE_URL=f"{base_url}/v1", OPENAI_API_KEY="bench",
+        )
+        connections = multiprocessing.Value("i", 0)
+        server = multiprocessing.Process(target=serve, args=(args.port, cert, key, connections), daemon=True)
+        server.start()
+        time.sleep(0.5)
+        try:
+            rows = []
+            for kind in args.kinds.split(","):
+                for name, step in (("fresh", fresh_step), ("pooled", pooled_step)):
+                    step(kind, base_url)  # imports and, for pooled, the first connection
+                    with connections.get_lock():
+                        connections.value = 0
+                    started = time.perf_counter()
+                    for _ in range(args.steps):
+                        step(kind, base_url)
+                    elapsed = time.perf_counter() - started
+                    rows.append({
+                        "kind": kind,
+                        "clients": name,
+                        "ms_per_step": elapsed * 1000 / args.steps,
+                        "connections_per_step": connections.value / args.steps,
+                    })
+            print_table(rows)
+        finally:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
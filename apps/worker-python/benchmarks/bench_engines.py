@@ -0,0 +1,130 @@
+"""Compare the sync and asyncio runner engines against a slow provider.
+
+Starts a stub server in a subprocess that answers OpenAI chat completions
+and webhooks after ``--latency`` seconds, then pushes ``--steps`` AI or
+webhook steps through:
+
+- sync: AIRunner/ConnectorRunner on a thread pool of ``--concurrency``
+- async: the async runners on the process event loop, ``--concurrency`` in flight
+
+and reports steps/sec and CPU milliseconds per step for each. Run from
+``apps/worker-python``::
+
+    python -m benchmarks.bench_engines --steps 500 --concurrency 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ._harness import print_table
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "bench",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+def serve(port: int, latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps(COMPLETION).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.daemon_threads = True
+    ThreadingHTTPServer.request_queue_size = 1024
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def step_config(kind: str, port: int):
+    if kind == "ai":
+        return {"type": "openai", "prompt": "hi", "model": "bench"}
+    return {"type": "webhook", "config": {"url": f"http://127.0.0.1:{port}/hook", "data": {"n": 1}}}
+
+
+def run_sync(kind: str, config, steps: int, concurrency: int):
+    from app.runners.ai_runner import AIRunner
+    from app.runners.connector_runner import ConnectorRunner
+
+    runner = AIRunner() if kind == "ai" else ConnectorRunner()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda _: runner.execute(config), range(steps)))
+
+
+def run_async(kind: str, config, steps: int, concurrency: int):
+    from app.runners import async_engine
+
+    async def main():
+        runner = async_engine.shared_runners()["ai" if kind == "ai" else "connector"]
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with limit:
+                return await runner.execute(config)
+
+        return await asyncio.gather(*(one() for _ in range(steps)))
+
+    return async_engine.run(main())
+
+
+def measure(engine, kind, config, steps, concurrency):
+    wall, cpu = time.perf_counter(), time.process_time()
+    results = engine(kind, config, steps, concurrency)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    failures = [r for r in results if not r.get("success")]
+    if failures:
+        raise RuntimeError(f"{len(failures)} steps failed, e.g. {failures[0].get('error')}")
+    return {"steps_per_sec": steps / wall, "cpu_ms_per_step": cpu * 1000 / steps}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--port", type=int, default=8199)
+    parser.add_argument("--kinds", default="ai,webhook")
+    args = parser.parse_args()
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    server = multiprocessing.Process(target=serve, args=(args.port, args.latency), daemon=True)
+    server.start()
+    time.sleep(0.5)
+
+    try:
+        rows = []
+        for kind in args.kinds.split(","):
+            config = step_config(kind, args.port)
+            for name, engine in (("sync", run_sync), ("async", run_async)):
+                row = {"kind": kind, "engine": name, "concurrency": args.concurrency}
+                row.update(measure(engine, kind, config, args.steps, args.concurrency))
+                rows.append(row)
+        print_table(rows)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
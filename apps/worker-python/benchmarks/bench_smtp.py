@@ -0,0 +1,105 @@
+"""Email delivery cost per message with and without the SMTP pool.
+
+Starts an aiosmtpd sink on localhost and sends ``--messages`` emails:
+
+- fresh: a new smtplib connection per message, as EmailRunner did before
+  app/smtp_pool.py
+- pooled: EmailRunner on the process's SmtpPool
+- throttled: the same with SMTP_RATE_LIMIT set to ``--rate``
+
+and reports messages/sec and SMTP connections per message. Run from
+``apps/worker-python``::
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.bench_smtp --messages 500 --rate 50
+"""
+
+import argparse
+import os
+import smtplib
+import time
+
+from ._harness import print_table
+
+
+class Sink:
+    def __init__(self):
+        self.sessions = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def step(index: int):
+    return {"to": [f"user{index}@example.com"], "subject": f"bench {index}", "body": "hello"}
+
+
+def fresh_send(port: int, messages: int):
+    from app.runners.email_runner import build_message
+
+    for i in range(messages):
+        msg, recipients = build_message(step(i), "bench@example.com")
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.send_message(msg, to_addrs=recipients)
+
+
+def pooled_send(pool, messages: int):
+    from app.runners.email_runner import EmailRunner
+
+    runner = EmailRunner()
+    runner.smtp = pool
+    for i in range(messages):
+        result = runner.execute(step(i))
+        if not result["success"]:
+            raise RuntimeError(result["error"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=50)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    from aiosmtpd.controller import Controller
+
+    os.environ.setdefault("FROM_EMAIL", "bench@example.com")
+    from app.smtp_pool import SmtpPool
+
+    sink = Sink()
+    controller = Controller(sink, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        rows = []
+        cases = (
+            ("fresh", lambda: fresh_send(args.port, args.messages)),
+            ("pooled", lambda: pooled_send(SmtpPool("127.0.0.1", args.port, None, None, starttls=False, rate=0), args.messages)),
+            ("throttled", lambda: pooled_send(SmtpPool("127.0.0.1", args.port, None, None, starttls=False, rate=args.rate), args.messages)),
+        )
+        for name, send in cases:
+            sink.sessions = sink.messages = 0
+            started = time.perf_counter()
+            send()
+            elapsed = time.perf_counter() - started
+            if sink.messages != args.messages:
+                raise RuntimeError(f"sink received {sink.messages} of {args.messages} messages")
+            rows.append({
+                "transport": name,
+                "messages": args.messages,
+                "messages_per_sec": args.messages / elapsed,
+                "connections_per_message": sink.sessions / args.messages,
+            })
+        print_table(rows)
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
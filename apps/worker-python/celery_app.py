@@ -45,7 +45,14 @@ app.conf.beat_schedule = {
         "task": "app.tasks.workflow_tasks.cleanup_old_runs",
         "schedule": crontab(hour=2, minute=0),  # Daily at 2 AM
     },
+    "maintain-partitions": {
+        "task": "app.tasks.workflow_tasks.maintain_partitions",
+        "schedule": crontab(hour=1, minute=30),  # Daily, ahead of cleanup
+    },
 }
 
+# Registers the metrics signal handlers and the worker's exporter
+from app import metrics  # noqa: E402,F401
+
 if __name__ == "__main__":
     app.start()